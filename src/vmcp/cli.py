@@ -1,16 +1,29 @@
 """CLI entry point for vulnerability scanner."""
 import argparse
 import asyncio
+import fcntl
+import shutil
+import subprocess
 import sys
 from pathlib import Path
 
-import subprocess
-import tempfile
+import orjson
 
 from vmcp.orchestrator import ScanOrchestrator
-from vmcp.tool_orchestrator import ToolBasedScanOrchestrator
-from vmcp.utils.aggregate_results import aggregate_results, generate_summary_table, save_aggregated_results
-from vmcp.utils.aggregate_tool_results import aggregate_tool_results, generate_tool_summary_table, save_tool_results
+from vmcp.tool_orchestrator import DEPENDENCY_FILES, ToolBasedScanOrchestrator
+from vmcp.utils.aggregate_results import (
+    aggregate_results,
+    iter_summary_lines,
+    save_aggregated_results,
+    scan_results_dir,
+    write_summary,
+)
+from vmcp.utils.aggregate_tool_results import (
+    TOOL_VIOLATIONS_SUFFIX,
+    aggregate_tool_results,
+    iter_tool_summary_lines,
+    save_tool_results,
+)
 from vmcp.utils.detect_language import detect_languages, select_scanners
 
 
@@ -25,64 +38,170 @@ def get_repo(repo_url: str):
     return org_name, repo_name
 
 
+# Persistent clone cache shared by `scan` and `scan-tool`
+CACHE_DIR = Path.home() / '.cache' / 'vmcp'
+
+# Scanners that only need dependency manifests, not the full source tree
+MANIFEST_ONLY_SCANNERS = frozenset({'trivy', 'osv-scanner'})
+
+# Paths checked out when only manifest scanners run: every dependency file
+# the tool-based grouping knows about, plus manifests matched by pattern
+MANIFEST_PATTERNS = sorted({f'**/{name}' for name in DEPENDENCY_FILES} | {
+    '**/requirements*.txt',
+    '**/Pipfile*',
+    '**/*.lock',
+    '**/Gemfile*',
+    '**/setup.cfg',
+    '**/pom.xml',
+    '**/build.gradle*',
+})
+
+
+async def run_git(*args: str) -> str:
+    """Run a git command without blocking the event loop, returning its stdout and raising on failure."""
+    proc = await asyncio.create_subprocess_exec(
+        'git', *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode, ['git', *args], stderr=stderr.decode('utf-8', errors='replace')
+        )
+    return stdout.decode('utf-8', errors='replace')
+
+
+async def get_or_clone_repo(repo_url: str, org_name: str, repo_name: str, sparse: bool = False) -> Path:
+    """
+    Return a local checkout of the repository, reusing a cached clone if present.
+
+    Clones are stored under ~/.cache/vmcp/<org>/<repo>. An existing clone is
+    refreshed to the remote HEAD instead of being cloned again. A sidecar
+    .lock file serializes concurrent callers working on the same repository.
+
+    Clones are partial (--filter=blob:none), so blobs are only downloaded for
+    checked-out files. With sparse=True only dependency manifests are checked
+    out; a later non-sparse call widens the checkout to the full tree.
+    """
+    repo_path = CACHE_DIR / org_name / repo_name
+    repo_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = repo_path.parent / f'{repo_name}.lock'
+
+    with open(lock_path, 'w') as lock_file:
+        # Wait for the lock in a thread so other clones keep running
+        await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+        try:
+            if (repo_path / '.git').is_dir():
+                print(f"Updating cached clone of {repo_url}...")
+                await run_git('-C', str(repo_path), 'fetch', '--depth', '1', 'origin', 'HEAD')
+                await run_git('-C', str(repo_path), 'reset', '--hard', 'FETCH_HEAD')
+                # Widen a manifest-only checkout when the full tree is needed
+                if not sparse and (repo_path / '.git' / 'info' / 'sparse-checkout').exists():
+                    await run_git('-C', str(repo_path), 'sparse-checkout', 'disable')
+            else:
+                # Remove any partial clone left behind by an interrupted run
+                if repo_path.exists():
+                    shutil.rmtree(repo_path)
+
+                print(f"Cloning {repo_url}...")
+                clone_args = [
+                    '-c', 'protocol.version=2', 'clone',
+                    '--depth', '1', '--single-branch', '--no-tags', '--filter=blob:none',
+                ]
+                if sparse:
+                    clone_args.append('--sparse')
+                await run_git(*clone_args, repo_url, str(repo_path))
+                if sparse:
+                    await run_git('-C', str(repo_path), 'sparse-checkout', 'set', '--no-cone', *MANIFEST_PATTERNS)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    return repo_path
+
+
+async def select_scanners_cached(repo_path: Path) -> list[str]:
+    """
+    Select scanners for a cached clone, reusing a previous language detection.
+
+    The detection result is stored next to the clone as <repo>.langs.json,
+    keyed by the checked-out commit, and reused while HEAD is unchanged.
+    """
+    cache_file = repo_path.parent / f'{repo_path.name}.langs.json'
+    try:
+        head = (await run_git('-C', str(repo_path), 'rev-parse', 'HEAD')).strip()
+    except subprocess.CalledProcessError:
+        head = ''
+
+    if head and cache_file.exists():
+        cached = orjson.loads(cache_file.read_bytes())
+        if cached.get('head') == head:
+            print("Using cached language detection...")
+            return cached['scanners']
+
+    print("Detecting repository languages...")
+    # Detection walks the whole tree, so keep it off the event loop
+    languages = await asyncio.to_thread(detect_languages, str(repo_path))
+    scanners = select_scanners(languages)
+    cache_file.write_bytes(orjson.dumps({'head': head, 'languages': languages, 'scanners': scanners}))
+    return scanners
+
+
+def yara_state_path(repo_path: Path) -> Path:
+    """
+    Return where incremental YARA scan state for a cached clone is kept.
+
+    Like <repo>.langs.json, it sits next to the clone rather than inside it,
+    so the scanned checkout is never modified. Findings are reused per file
+    by mtime, so checking out another commit rescans exactly the files it
+    changed.
+    """
+    return repo_path.parent / f'{repo_path.name}.yara.json'
+
+
 async def scan_repository(repo_url: str, output_dir: str, scanners: list[str] | None = None) -> None:
     """Scan a repository for vulnerabilities."""
     org_name, repo_name = get_repo(repo_url)
-    # Clone to temp directory
-    with tempfile.TemporaryDirectory() as temp_dir:
-        repo_path = Path(temp_dir) / repo_name
-
-        print(f"Cloning {repo_url}...")
-        subprocess.run(
-            ['git', 'clone', '--depth', '1', repo_url, str(repo_path)],
-            check=True,
-            capture_output=True
-        )
+    # Manifest-only scanners don't need the source tree checked out
+    sparse = scanners is not None and set(scanners) <= MANIFEST_ONLY_SCANNERS
+    repo_path = await get_or_clone_repo(repo_url, org_name, repo_name, sparse=sparse)
 
-        # Auto-detect scanners if not specified
-        if scanners is None:
-            print("Detecting repository languages...")
-            languages = detect_languages(str(repo_path))
-            scanners = select_scanners(languages)
-            print(f"Selected scanners: {', '.join(scanners)}")
+    # Auto-detect scanners if not specified
+    if scanners is None:
+        scanners = await select_scanners_cached(repo_path)
+        print(f"Selected scanners: {', '.join(scanners)}")
 
-        # Run scans
-        print(f"Running {len(scanners)} scanners in parallel...")
-        orchestrator = ScanOrchestrator(str(repo_path), org_name, repo_name)
-        results = await orchestrator.run_all_scanners(scanners)
+    # Run scans
+    print(f"Running {len(scanners)} scanners in parallel...")
+    orchestrator = ScanOrchestrator(str(repo_path), org_name, repo_name, str(yara_state_path(repo_path)))
 
-        # Save results (scanner-specific files)
-        orchestrator.save_results(results, output_dir)
+    # Save each scanner's results (scanner-specific files) as soon as it finishes
+    async for scanner, vulnerabilities in orchestrator.stream_results(scanners):
+        orchestrator.save_results({scanner: vulnerabilities}, output_dir)
 
 
 async def scan_repository_by_tool(repo_url: str, output_dir: str, scanners: list[str] | None = None) -> None:
     """Scan a repository and group vulnerabilities by MCP tools."""
     org_name, repo_name = get_repo(repo_url)
-    # Clone to temp directory
-    with tempfile.TemporaryDirectory() as temp_dir:
-        repo_path = Path(temp_dir) / repo_name
-
-        print(f"Cloning {repo_url}...")
-        subprocess.run(
-            ['git', 'clone', '--depth', '1', repo_url, str(repo_path)],
-            check=True,
-            capture_output=True
-        )
+    repo_path = await get_or_clone_repo(repo_url, org_name, repo_name)
 
-        # Auto-detect scanners if not specified
-        if scanners is None:
-            print("Detecting repository languages...")
-            languages = detect_languages(str(repo_path))
-            scanners = select_scanners(languages)
-            print(f"Selected scanners: {', '.join(scanners)}")
+    # Auto-detect scanners if not specified
+    if scanners is None:
+        scanners = await select_scanners_cached(repo_path)
+        print(f"Selected scanners: {', '.join(scanners)}")
 
-        # Run tool-based scans
-        print(f"Running {len(scanners)} scanners in parallel (tool-based mode)...")
-        orchestrator = ToolBasedScanOrchestrator(str(repo_path), org_name, repo_name)
-        results = await orchestrator.run_all_scanners_by_tool(scanners)
+    # Run tool-based scans
+    print(f"Running {len(scanners)} scanners in parallel (tool-based mode)...")
+    # Static tool detection results are kept next to the clone and reused
+    # for files whose mtime and size are unchanged
+    tool_cache_path = repo_path.parent / f'{repo_path.name}.tools.json'
+    orchestrator = ToolBasedScanOrchestrator(
+        str(repo_path), org_name, repo_name, str(tool_cache_path), str(yara_state_path(repo_path))
+    )
+    results = await orchestrator.run_all_scanners_by_tool(scanners)
 
-        # Save tool-based results
-        orchestrator.save_tool_results(results, output_dir)
+    # Save tool-based results
+    orchestrator.save_tool_results(results, output_dir)
 
 
 def aggregate_command(repo_url: str, results_dir: str) -> None:
@@ -94,31 +213,31 @@ def aggregate_command(repo_url: str, results_dir: str) -> None:
     # Save aggregated results to violations.json
     save_aggregated_results(org_name, repo_name, results, results_dir)
 
-    # Generate summary table from all repo files in results directory
-    summary = generate_summary_table(results_dir)
-
-    with open('SCAN_RESULTS.md', 'w') as f:
-        f.write(summary)
-
-    print("Generated SCAN_RESULTS.md with vulnerability summary")
+    # Generate summary table from all repo files in results directory,
+    # streaming it to SCAN_RESULTS.md row by row; skipped when no violations
+    # file changed since the last run
+    if write_summary('SCAN_RESULTS.md', results_dir, '-violations.json', iter_summary_lines):
+        print("Generated SCAN_RESULTS.md with vulnerability summary")
+    else:
+        print("SCAN_RESULTS.md is up to date")
 
 
 def aggregate_tool_command(repo_url: str, results_dir: str) -> None:
     """Aggregate tool-based results and generate tool vulnerability report."""
     print(f"Aggregating tool-based results from {results_dir}...")
     org_name, repo_name = get_repo(repo_url)
-    results = aggregate_tool_results(org_name, repo_name, results_dir)
+    # One directory scan serves both the merge and the cleanup of scanner files
+    scanner_files = scan_results_dir(results_dir, TOOL_VIOLATIONS_SUFFIX)
+    results = aggregate_tool_results(org_name, repo_name, results_dir, scanner_files)
 
     # Save aggregated tool results
-    save_tool_results(org_name, repo_name, results, results_dir)
+    save_tool_results(org_name, repo_name, results, results_dir, scanner_files)
 
     # Generate summary table from all repo files in results directory
-    summary = generate_tool_summary_table(results_dir)
-
-    with open('SCAN_RESULTS_TOOLS.md', 'w') as f:
-        f.write(summary)
-
-    print("Generated SCAN_RESULTS_TOOLS.md with tool-based vulnerability summary")
+    if write_summary('SCAN_RESULTS_TOOLS.md', results_dir, '-tools.json', iter_tool_summary_lines):
+        print("Generated SCAN_RESULTS_TOOLS.md with tool-based vulnerability summary")
+    else:
+        print("SCAN_RESULTS_TOOLS.md is up to date")
 
 
 def main():
@@ -1,22 +1,42 @@
 from datetime import datetime
 from enum import StrEnum
-from typing import Literal, Optional, Sequence
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
-type VulnerabilitySeverity = Literal[
-    "UNKNOWN",
-    "NONE",
-    "LOW",
-    "MEDIUM",
-    "HIGH",
-    "CRITICAL",
-    "WARNING",
-]
 type VulnerabilitySource = Literal["osv", "trivy", "yara"]
 
 
+class VulnerabilitySeverity(StrEnum):
+    """Vulnerability severity levels."""
+
+    UNKNOWN = "UNKNOWN"
+    NONE = "NONE"
+    LOW = "LOW"
+    MEDIUM = "MEDIUM"
+    HIGH = "HIGH"
+    CRITICAL = "CRITICAL"
+    WARNING = "WARNING"
+
+    @property
+    def priority(self) -> int:
+        """Sort priority of the severity (lower is worse)."""
+        return SEVERITY_PRIORITY[self]
+
+
+# Severity sort priority, worst first. Keys hash like their plain string values.
+SEVERITY_PRIORITY: dict[str, int] = {
+    VulnerabilitySeverity.CRITICAL: 0,
+    VulnerabilitySeverity.HIGH: 1,
+    VulnerabilitySeverity.MEDIUM: 2,
+    VulnerabilitySeverity.LOW: 3,
+    VulnerabilitySeverity.UNKNOWN: 4,
+    VulnerabilitySeverity.WARNING: 5,
+    VulnerabilitySeverity.NONE: 6,
+}
+
+
 class ScmProvider(StrEnum):
     """Types of scm providers."""
 
@@ -49,12 +69,12 @@ class VulnerabilityModel(BaseModel):
     id: str
     identifier_type: str
     affected_range: str
-    aliases: Sequence[str] = Field(default_factory=list)
+    aliases: list[str] = Field(default_factory=list)
     details: str
     fixed_version: Optional[str] = None
     published: datetime | None = None
-    references: Sequence[VulnerabilityReferenceModel] = Field(default_factory=list)
-    scores: Sequence[VulnerabilityScoreModel] = Field(default_factory=list)
+    references: list[VulnerabilityReferenceModel] = Field(default_factory=list)
+    scores: list[VulnerabilityScoreModel] = Field(default_factory=list)
     severity: VulnerabilitySeverity
     source: VulnerabilitySource | None = None
     summary: str
@@ -64,5 +84,8 @@ class VulnerabilityModel(BaseModel):
     confidence: Optional[str] = None
     file_location: Optional[str] = None
     line_range: Optional[str] = None
-    categories: Sequence[str] = Field(default_factory=list)
+    categories: list[str] = Field(default_factory=list)
+
 
+# Batch validator/serializer for scanner output; faster than per-model calls
+VULNERABILITY_LIST_ADAPTER = TypeAdapter(list[VulnerabilityModel])
@@ -1,8 +1,11 @@
 """Scan orchestrator for running multiple scanners in parallel."""
 import asyncio
-import json
+import os
+from collections.abc import AsyncIterator
 from pathlib import Path
-from typing import Any
+from typing import BinaryIO
+
+import orjson
 
 from vmcp.models import VulnerabilityModel
 from vmcp.scanners import OSVScanner, SemgrepScanner, TrivyScanner
@@ -15,62 +18,106 @@ SCANNER_MAP = {
     'semgrep': SemgrepScanner,
     'yara': YaraScanner,
 }
+SCANNER_NAMES: frozenset[str] = frozenset(SCANNER_MAP)
+
+
+def max_parallel_scanners() -> int:
+    """
+    Return the scanner concurrency limit from VMCP_MAX_PARALLEL_SCANNERS.
+
+    Missing, non-numeric or non-positive values fall back to the CPU count;
+    process_cpu_count() honours the CPU affinity mask (e.g. container limits).
+    """
+    default = os.process_cpu_count() or 2
+    try:
+        limit = int(os.environ.get('VMCP_MAX_PARALLEL_SCANNERS', default))
+    except ValueError:
+        return default
+    return limit if limit > 0 else default
 
 
 class ScanOrchestrator:
     """Orchestrates multiple vulnerability scanners."""
 
-    def __init__(self, repo_path: str, org_name: str, repo_name: str):
+    SCANNER_MAP = SCANNER_MAP
+    SCANNER_NAMES = SCANNER_NAMES
+
+    def __init__(self, repo_path: str, org_name: str, repo_name: str, yara_state_path: str | None = None):
         self.repo_path = repo_path
         self.org_name = org_name
         self.repo_name = repo_name
+        self.yara_state_path = yara_state_path
+        # Cap concurrent scanners so they don't thrash small CI runners
+        self.max_parallel_scanners = max_parallel_scanners()
+        self._semaphore = asyncio.Semaphore(self.max_parallel_scanners)
 
     async def run_scanner(self, scanner_class: type[BaseScanner]) -> tuple[str, list[VulnerabilityModel]]:
         """Run a single scanner."""
         scanner = scanner_class(self.repo_path, self.org_name, self.repo_name)
+        if isinstance(scanner, YaraScanner) and self.yara_state_path is not None:
+            scanner.state_path = Path(self.yara_state_path)
 
         if not scanner.is_applicable():
             return scanner.name, []
 
         try:
-            vulnerabilities = await scanner.scan()
+            async with self._semaphore:
+                vulnerabilities = await scanner.scan()
             return scanner.name, vulnerabilities
         except Exception as e:
             print(f"Error running {scanner.name}: {e}")
             return scanner.name, []
 
-    async def run_all_scanners(self, scanner_names: list[str] | None = None) -> dict[str, list[VulnerabilityModel]]:
-        """Run all scanners in parallel."""
+    def _select_scanner_classes(self, scanner_names: list[str] | None) -> list[type[BaseScanner]]:
+        """Resolve scanner names to scanner classes, ignoring unknown names."""
         if scanner_names is None:
-            scanner_names = list(SCANNER_MAP.keys())
+            scanner_names = list(self.SCANNER_MAP.keys())
 
-        # Filter to only valid scanners
-        scanner_classes = [
-            SCANNER_MAP[name]
+        return [
+            self.SCANNER_MAP[name]
             for name in scanner_names
-            if name in SCANNER_MAP
+            if name in self.SCANNER_NAMES
         ]
 
-        # Run all scanners in parallel
-        tasks = [self.run_scanner(scanner_class) for scanner_class in scanner_classes]
+    async def run_all_scanners(self, scanner_names: list[str] | None = None) -> dict[str, list[VulnerabilityModel]]:
+        """Run all scanners in parallel."""
+        tasks = [self.run_scanner(scanner_class) for scanner_class in self._select_scanner_classes(scanner_names)]
         results = await asyncio.gather(*tasks)
 
         return dict(results)
 
+    async def stream_results(
+        self, scanner_names: list[str] | None = None
+    ) -> AsyncIterator[tuple[str, list[VulnerabilityModel]]]:
+        """Run all scanners in parallel, yielding (scanner, vulnerabilities) as each one finishes."""
+        tasks = [self.run_scanner(scanner_class) for scanner_class in self._select_scanner_classes(scanner_names)]
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+
     def save_results(self, results: dict[str, list[VulnerabilityModel]], output_dir: str) -> None:
         """Save scan results to JSON file in new simplified format."""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Format results: {"scanner": [vulns]}
-        formatted_results = {
-            scanner: [vuln.model_dump(mode='json') for vuln in vulnerabilities]
-            for scanner, vulnerabilities in results.items()
-        }
-
-        # Save to scanner-specific temp file
-        for scanner in results.keys():
+        # Save to scanner-specific temp file, format: {"scanner": [vulns]}
+        for scanner, vulnerabilities in results.items():
             scanner_file = output_path / f'{scanner}-violations.json'
-            with open(scanner_file, 'w') as f:
-                json.dump({scanner: formatted_results[scanner]}, f, indent=2, default=str)
+            with open(scanner_file, 'wb') as f:
+                self._write_scanner_results(f, scanner, vulnerabilities)
             print(f"Results saved to {scanner_file}")
+
+    @staticmethod
+    def _write_scanner_results(f: BinaryIO, scanner: str, vulnerabilities: list[VulnerabilityModel]) -> None:
+        """
+        Stream {"scanner": [vulns]} to f one vulnerability at a time.
+
+        Produces the same bytes as dumping the whole document with
+        OPT_INDENT_2, without materializing every vulnerability as a dict.
+        Datetimes are left as-is; orjson serializes them natively.
+        """
+        f.write(b'{\n  ' + orjson.dumps(scanner) + b': [')
+        for i, vuln in enumerate(vulnerabilities):
+            f.write(b',\n    ' if i else b'\n    ')
+            encoded = orjson.dumps(vuln.model_dump(), option=orjson.OPT_INDENT_2 | orjson.OPT_UTC_Z)
+            f.write(encoded.replace(b'\n', b'\n    '))
+        f.write(b'\n  ]\n}' if vulnerabilities else b']\n}')
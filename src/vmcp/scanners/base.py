@@ -1,17 +1,69 @@
 """Base scanner interface and common functionality."""
+import asyncio
+import os
+import shutil
 from abc import ABC, abstractmethod
-from typing import Any
+from dataclasses import dataclass
 
-from vmcp.models import VulnerabilityModel
+from vmcp.models import VULNERABILITY_LIST_ADAPTER, VulnerabilityModel
 
+# Niceness increment applied to external scanner processes
+SCANNER_NICENESS = 10
 
+
+def lower_priority() -> None:
+    """
+    Lower the priority of the current process by SCANNER_NICENESS.
+
+    On Linux this only affects the calling thread (and threads it starts
+    afterwards), so call it before starting any threads.
+    """
+    try:
+        niceness = min(os.getpriority(os.PRIO_PROCESS, 0) + SCANNER_NICENESS, 19)
+        os.setpriority(os.PRIO_PROCESS, 0, niceness)
+    except OSError:
+        pass
+
+
+async def create_scanner_process(*command: str) -> asyncio.subprocess.Process:
+    """
+    Start a scanner subprocess at lower priority with stdout piped.
+
+    The command runs under nice(1), so every thread and child process it
+    starts inherits the niceness from exec onward. Renicing the PID after
+    the spawn would only reach its main thread, and preexec_fn is unsafe
+    while other threads (tool analysis, YARA, call graph building) are running.
+    """
+    # nice would report a missing scanner only through its exit status, so
+    # fail like a direct exec does
+    if shutil.which(command[0]) is None:
+        raise FileNotFoundError(f"{command[0]} not found")
+    return await asyncio.create_subprocess_exec(
+        'nice', '-n', str(SCANNER_NICENESS), *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+
+def validate_vulnerabilities(vulnerabilities: list[VulnerabilityModel]) -> list[VulnerabilityModel]:
+    """
+    Re-validate models built with model_construct when VMCP_VALIDATE is set.
+
+    Scanner parsers skip pydantic validation for speed; this is the opt-in
+    check (for CI/debugging) that their output still matches the schema.
+    """
+    if os.getenv('VMCP_VALIDATE'):
+        VULNERABILITY_LIST_ADAPTER.validate_python([vuln.model_dump() for vuln in vulnerabilities])
+    return vulnerabilities
+
+
+@dataclass(slots=True)
 class BaseScanner(ABC):
     """Base class for all vulnerability scanners."""
 
-    def __init__(self, repo_path: str, org_name: str, repo_name: str):
-        self.repo_path = repo_path
-        self.org_name = org_name
-        self.repo_name = repo_name
+    repo_path: str
+    org_name: str
+    repo_name: str
 
     @property
     @abstractmethod
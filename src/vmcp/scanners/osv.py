@@ -1,20 +1,37 @@
 """OSV Scanner implementation."""
-import json
-import subprocess
+import asyncio
 from datetime import datetime
 from typing import Any
 
+import ijson
+
 from vmcp.models import (
     VulnerabilityModel,
     VulnerabilityReferenceModel,
     VulnerabilityScoreModel,
+    VulnerabilitySeverity,
 )
-from vmcp.scanners.base import BaseScanner
+from vmcp.scanners.base import BaseScanner, create_scanner_process, validate_vulnerabilities
+
+# ijson prefix of each vulnerability record in osv-scanner JSON output
+OSV_VULNERABILITY_PREFIX = 'results.item.packages.item.vulnerabilities.item'
+
+# Map OSV severity values to our standard severity levels
+OSV_SEVERITY_MAP = {
+    'MODERATE': VulnerabilitySeverity.MEDIUM,  # OSV uses MODERATE, we use MEDIUM
+    'CRITICAL': VulnerabilitySeverity.CRITICAL,
+    'HIGH': VulnerabilitySeverity.HIGH,
+    'MEDIUM': VulnerabilitySeverity.MEDIUM,
+    'LOW': VulnerabilitySeverity.LOW,
+    'UNKNOWN': VulnerabilitySeverity.UNKNOWN,
+}
 
 
 class OSVScanner(BaseScanner):
     """OSV vulnerability scanner."""
 
+    __slots__ = ()
+
     @property
     def name(self) -> str:
         return "osv-scanner"
@@ -22,96 +39,95 @@ class OSVScanner(BaseScanner):
     async def scan(self) -> list[VulnerabilityModel]:
         """Execute OSV scan."""
         try:
-            result = subprocess.run(
-                ['osv-scanner', '--format', 'json', '--recursive', self.repo_path],
-                capture_output=True,
-                text=True,
-                timeout=300
+            proc = await create_scanner_process(
+                'osv-scanner', '--format', 'json', '--recursive', self.repo_path,
             )
-
-            # OSV scanner returns non-zero if vulnerabilities found
-            if not result.stdout:
+            try:
+                # Stream records off stdout so only one vulnerability is materialized at a time
+                async with asyncio.timeout(300):
+                    vulnerabilities = [
+                        self._parse_osv_vulnerability(vuln)
+                        async for vuln in ijson.items_async(proc.stdout, OSV_VULNERABILITY_PREFIX, use_float=True)
+                    ]
+                    await proc.wait()
+                return validate_vulnerabilities(vulnerabilities)
+            except TimeoutError:
+                print(f"OSV scan timed out for {self.repo_path}")
                 return []
+            except ijson.IncompleteJSONError:
+                # No (or truncated) JSON output from osv-scanner
+                return []
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
 
-            data = json.loads(result.stdout)
-            return self._parse_osv_output(data)
-
-        except subprocess.TimeoutExpired:
-            print(f"OSV scan timed out for {self.repo_path}")
-            return []
         except Exception as e:
             print(f"OSV scan failed: {e}")
             return []
 
-    def _parse_osv_output(self, data: dict[str, Any]) -> list[VulnerabilityModel]:
-        """Parse OSV JSON output."""
-        vulnerabilities = []
-
-        for result in data.get('results', []):
-            for package in result.get('packages', []):
-                for vuln in package.get('vulnerabilities', []):
-                    # Parse references
-                    references = []
-                    for ref in vuln.get('references', []):
-                        references.append(
-                            VulnerabilityReferenceModel(
-                                type=ref.get('type', 'web'),
-                                url=ref.get('url', '')
-                            )
-                        )
+    def _parse_osv_vulnerability(self, vuln: dict[str, Any]) -> VulnerabilityModel:
+        """Parse a single OSV vulnerability record."""
+        # Parse references
+        references = []
+        for ref in vuln.get('references', []):
+            references.append(
+                VulnerabilityReferenceModel.model_construct(
+                    type=ref.get('type', 'web'),
+                    url=ref.get('url', '')
+                )
+            )
 
-                    # Parse scores
-                    scores = []
-                    if 'severity' in vuln:
-                        for severity in vuln['severity']:
-                            if severity.get('type') == 'CVSS_V3':
-                                scores.append(
-                                    VulnerabilityScoreModel(
-                                        type='cvss',
-                                        value=float(severity.get('score', 0)),
-                                        version='3.0'
-                                    )
-                                )
-
-                    # Parse published date
-                    published = None
-                    if 'published' in vuln:
-                        try:
-                            published = datetime.fromisoformat(
-                                vuln['published'].replace('Z', '+00:00')
-                            )
-                        except Exception:
-                            pass
-
-                    # Determine severity and normalize it
-                    severity = vuln.get('database_specific', {}).get('severity', 'UNKNOWN').upper()
-
-                    # Map OSV severity values to our standard severity levels
-                    severity_map = {
-                        'MODERATE': 'MEDIUM',  # OSV uses MODERATE, we use MEDIUM
-                        'CRITICAL': 'CRITICAL',
-                        'HIGH': 'HIGH',
-                        'MEDIUM': 'MEDIUM',
-                        'LOW': 'LOW',
-                        'UNKNOWN': 'UNKNOWN',
-                    }
-                    severity = severity_map.get(severity, 'UNKNOWN')
-
-                    vulnerability = VulnerabilityModel(
-                        id=vuln.get('id', ''),
-                        identifier_type='cve' if vuln.get('id', '').startswith('CVE') else 'other',
-                        affected_range=vuln.get('affected', [{}])[0].get('ranges', [{}])[0].get('events', [{}])[0].get('introduced', '') if vuln.get('affected') else '',
-                        aliases=vuln.get('aliases', []),
-                        details=vuln.get('details', ''),
-                        fixed_version=vuln.get('affected', [{}])[0].get('ranges', [{}])[0].get('events', [{}])[-1].get('fixed') if vuln.get('affected') else None,
-                        published=published,
-                        references=references,
-                        scores=scores,
-                        severity=severity,
-                        source='osv',
-                        summary=vuln.get('summary', ''),
+        # Parse scores
+        scores = []
+        if 'severity' in vuln:
+            for severity in vuln['severity']:
+                if severity.get('type') == 'CVSS_V3':
+                    scores.append(
+                        VulnerabilityScoreModel.model_construct(
+                            type='cvss',
+                            value=float(severity.get('score', 0)),
+                            version='3.0'
+                        )
                     )
 
-                    vulnerabilities.append(vulnerability)
-
-        return vulnerabilities
+        # Parse published date
+        published = None
+        if 'published' in vuln:
+            try:
+                published = datetime.fromisoformat(
+                    vuln['published'].replace('Z', '+00:00')
+                )
+            except Exception:
+                pass
+
+        # Determine severity and normalize it
+        severity = vuln.get('database_specific', {}).get('severity', 'UNKNOWN').upper()
+        severity = OSV_SEVERITY_MAP.get(severity, VulnerabilitySeverity.UNKNOWN)
+
+        # Introduced/fixed versions come from the first range of the first affected package
+        affected = vuln.get('affected') or ()
+        ranges = (affected[0].get('ranges') or ()) if affected else ()
+        events = (ranges[0].get('events') or ()) if ranges else ()
+        introduced = events[0].get('introduced', '') if events else ''
+        fixed = events[-1].get('fixed') if events else None
+
+        vuln_id = vuln.get('id', '')
+
+        # Fields come from typed code paths; validation is opt-in via VMCP_VALIDATE
+        vulnerability = VulnerabilityModel.model_construct(
+            id=vuln_id,
+            identifier_type='cve' if vuln_id.startswith('CVE') else 'other',
+            affected_range=introduced,
+            aliases=vuln.get('aliases', []),
+            details=vuln.get('details', ''),
+            fixed_version=fixed,
+            published=published,
+            references=references,
+            scores=scores,
+            severity=severity,
+            source='osv',
+            summary=vuln.get('summary', ''),
+        )
+
+        return vulnerability
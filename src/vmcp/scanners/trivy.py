@@ -1,21 +1,39 @@
 """Trivy scanner implementation."""
 import asyncio
-import json
-import subprocess
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
+import ijson
+
 from vmcp.models import (
     VulnerabilityModel,
     VulnerabilityReferenceModel,
     VulnerabilityScoreModel,
 )
-from vmcp.scanners.base import BaseScanner
+from vmcp.scanners.base import BaseScanner, create_scanner_process
+
+# ijson prefix of each vulnerability record in trivy JSON output
+TRIVY_VULNERABILITY_PREFIX = 'Results.item.Vulnerabilities.item'
+
+
+@lru_cache(maxsize=4096)
+def _parse_published(value: str | None) -> datetime | None:
+    """Parse a Trivy timestamp; many CVEs share the same publish date."""
+    if not value:
+        return None
+    try:
+        # fromisoformat accepts a trailing 'Z' natively since Python 3.11
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
 
 
 class TrivyScanner(BaseScanner):
     """Trivy vulnerability scanner."""
 
+    __slots__ = ()
+
     @property
     def name(self) -> str:
         return "trivy"
@@ -24,86 +42,67 @@ class TrivyScanner(BaseScanner):
         """Execute Trivy scan."""
         try:
             # Run trivy scan
-            result = subprocess.run(
-                [
-                    'trivy',
-                    'fs',
-                    '--format', 'json',
-                    '--severity', 'UNKNOWN,LOW,MEDIUM,HIGH,CRITICAL',
-                    self.repo_path
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
+            proc = await create_scanner_process(
+                'trivy',
+                'fs',
+                '--format', 'json',
+                '--severity', 'UNKNOWN,LOW,MEDIUM,HIGH,CRITICAL',
+                self.repo_path,
             )
-
-            if result.returncode != 0 and not result.stdout:
+            try:
+                # Stream records off stdout so only one vulnerability is materialized at a time
+                async with asyncio.timeout(300):
+                    vulnerabilities = [
+                        self._parse_trivy_vulnerability(vuln)
+                        async for vuln in ijson.items_async(proc.stdout, TRIVY_VULNERABILITY_PREFIX, use_float=True)
+                    ]
+                    await proc.wait()
+                return vulnerabilities
+            except TimeoutError:
+                print(f"Trivy scan timed out for {self.repo_path}")
                 return []
+            except ijson.IncompleteJSONError:
+                # No (or truncated) JSON output from trivy
+                return []
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
 
-            data = json.loads(result.stdout)
-            return self._parse_trivy_output(data)
-
-        except subprocess.TimeoutExpired:
-            print(f"Trivy scan timed out for {self.repo_path}")
-            return []
         except Exception as e:
             print(f"Trivy scan failed: {e}")
             return []
 
-    def _parse_trivy_output(self, data: dict[str, Any]) -> list[VulnerabilityModel]:
-        """Parse Trivy JSON output."""
-        vulnerabilities = []
-
-        for result in data.get('Results', []):
-            for vuln in result.get('Vulnerabilities', []):
-                # Parse references
-                references = []
-                for ref in vuln.get('References', []):
-                    references.append(
-                        VulnerabilityReferenceModel(
-                            type='web',
-                            url=ref
-                        )
-                    )
-
-                # Parse scores
-                scores = []
-                if 'CVSS' in vuln:
-                    for version, score_data in vuln['CVSS'].items():
-                        if isinstance(score_data, dict) and 'V3Score' in score_data:
-                            scores.append(
-                                VulnerabilityScoreModel(
-                                    type='cvss',
-                                    value=score_data['V3Score'],
-                                    version=version
-                                )
-                            )
-
-                # Parse published date
-                published = None
-                if 'PublishedDate' in vuln:
-                    try:
-                        published = datetime.fromisoformat(
-                            vuln['PublishedDate'].replace('Z', '+00:00')
-                        )
-                    except Exception:
-                        pass
-
-                vulnerability = VulnerabilityModel(
-                    id=vuln.get('VulnerabilityID', ''),
-                    identifier_type='cve' if vuln.get('VulnerabilityID', '').startswith('CVE') else 'other',
-                    affected_range=vuln.get('InstalledVersion', ''),
-                    aliases=[],
-                    details=vuln.get('Description', ''),
-                    fixed_version=vuln.get('FixedVersion'),
-                    published=published,
-                    references=references,
-                    scores=scores,
-                    severity=vuln.get('Severity', 'UNKNOWN'),
-                    source='trivy',
-                    summary=vuln.get('Title', ''),
-                )
-
-                vulnerabilities.append(vulnerability)
-
-        return vulnerabilities
+    def _parse_trivy_vulnerability(self, vuln: dict[str, Any]) -> VulnerabilityModel:
+        """Parse a single Trivy vulnerability record."""
+        # Parse references
+        references = [
+            VulnerabilityReferenceModel(type='web', url=ref)
+            for ref in vuln.get('References') or ()
+        ]
+
+        # Parse CVSS v3 scores
+        scores = [
+            VulnerabilityScoreModel(type='cvss', value=score_data['V3Score'], version=version)
+            for version, score_data in (vuln.get('CVSS') or {}).items()
+            if isinstance(score_data, dict) and 'V3Score' in score_data
+        ]
+
+        vuln_id = vuln.get('VulnerabilityID', '')
+
+        vulnerability = VulnerabilityModel(
+            id=vuln_id,
+            identifier_type='cve' if vuln_id.startswith('CVE') else 'other',
+            affected_range=vuln.get('InstalledVersion', ''),
+            aliases=[],
+            details=vuln.get('Description', ''),
+            fixed_version=vuln.get('FixedVersion'),
+            published=_parse_published(vuln.get('PublishedDate')),
+            references=references,
+            scores=scores,
+            severity=vuln.get('Severity', 'UNKNOWN'),
+            source='trivy',
+            summary=vuln.get('Title', ''),
+        )
+
+        return vulnerability
@@ -1,9 +1,22 @@
 """YARA scanner implementation for malware and threat detection."""
+import asyncio
+import bisect
+import mmap
+import multiprocessing
 import os
+import re
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import batched
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 try:
     import yara
     YARA_AVAILABLE = True
@@ -11,24 +24,114 @@ except ImportError:
     YARA_AVAILABLE = False
 
 from vmcp.models import VulnerabilityModel, VulnerabilityReferenceModel
-from vmcp.scanners.base import BaseScanner
+from vmcp.scanners.base import BaseScanner, lower_priority
+
+
+# Path to YARA rules file (relative to this file: ../../../../yara-forge-rules-core/)
+YARA_RULES_PATH = (Path(__file__).parent / "../../../yara-forge-rules-core/yara-rules-core.yar").resolve()
+
+# Where compiled rules are kept when the rules directory is read-only,
+# alongside the clone cache
+YARA_COMPILED_RULES_FALLBACK_DIR = Path.home() / '.cache' / 'vmcp' / 'yara'
+
+# Common non-code directories skipped during traversal
+YARA_EXCLUDED_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv',
+    '.mypy_cache', '.pytest_cache', '.ruff_cache', '.tox',
+})
+
+# Rule tags that raise a match's severity regardless of its score
+YARA_CRITICAL_TAGS = frozenset({'MALWARE', 'RANSOMWARE', 'BACKDOOR', 'TROJAN'})
+YARA_HIGH_TAGS = frozenset({'EXPLOIT', 'SHELLCODE', 'SUSPICIOUS', 'WEBSHELL'})
+
+# Number of files handed to a worker process at a time
+YARA_BATCH_SIZE = 64
+
+# Compiled rules and a scanner used to convert matches, set up once per
+# worker process by _init_worker
+_WORKER_RULES = None
+_WORKER_SCANNER: 'YaraScanner | None' = None
+
+
+def _init_worker(compiled_rules_path: str, repo_path: str) -> None:
+    """Load the compiled rules once per worker process."""
+    global _WORKER_RULES, _WORKER_SCANNER
+    lower_priority()
+    _WORKER_RULES = yara.load(compiled_rules_path)
+    _WORKER_SCANNER = YaraScanner(repo_path, '', '')
+
+
+def _find_newlines(data: bytes | mmap.mmap) -> list[int]:
+    """Return the sorted byte offsets of every newline in data."""
+    return [m.start() for m in re.finditer(b'\n', data)]
 
 
+def _match_file(filepath: str, relative_path: str) -> list[VulnerabilityModel]:
+    """Match one file, memory-mapped once for both YARA and line lookups."""
+    scanner = _WORKER_SCANNER
+    abs_filepath = os.path.join(scanner.repo_path, relative_path)
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files can't be mapped
+            matches = _WORKER_RULES.match(data=b'')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                matches = _WORKER_RULES.match(data=data)
+                if matches:
+                    # Seed the line index so _offset_to_line_range doesn't re-read the file
+                    scanner._line_idx_cache[abs_filepath] = _find_newlines(data)
+    try:
+        return [scanner._parse_yara_match(match, relative_path) for match in matches]
+    finally:
+        # The worker outlives this file, so don't keep its line index around
+        scanner._line_idx_cache.pop(abs_filepath, None)
+
+
+def _scan_batch(paths: tuple[tuple[str, str], ...]) -> tuple[list[VulnerabilityModel], list[str]]:
+    """Match a batch of (absolute, relative) file paths in a worker process.
+
+    yara.Match objects can't be pickled, so matches are converted to
+    VulnerabilityModel here rather than in the parent process. Returns the
+    matches and the relative paths of files that could not be scanned.
+    """
+    vulnerabilities = []
+    failed = []
+    for filepath, relative_path in paths:
+        try:
+            vulnerabilities.extend(_match_file(filepath, relative_path))
+        except yara.Error:
+            # Skip files that can't be scanned (permission errors, binary issues, etc.)
+            failed.append(relative_path)
+        except Exception:
+            # Skip any other errors
+            failed.append(relative_path)
+    return vulnerabilities, failed
+
+
+@dataclass(slots=True)
 class YaraScanner(BaseScanner):
     """YARA malware and threat detection scanner."""
 
-    def __init__(self, repo_path: str, org_name: str, repo_name: str):
-        super().__init__(repo_path, org_name, repo_name)
-        # Path to YARA rules file (relative to this file: ../../../../yara-forge-rules-core/)
-        self.rules_path = (Path(__file__).parent / "../../../yara-forge-rules-core/yara-rules-core.yar").resolve()
-        self.max_file_size = 10 * 1024 * 1024  # 10MB limit per file
+    rules_path: Path = field(default=YARA_RULES_PATH, init=False)
+    max_file_size: int = field(default=10 * 1024 * 1024, init=False)  # 10MB limit per file
+    # Where incremental scan state is kept, outside the scanned tree; None
+    # disables it so every scan matches all files
+    state_path: Path | None = field(default=None, init=False)
+    # Newline byte offsets per file, shared by all matches in the same file
+    _line_idx_cache: dict[str, list[int]] = field(default_factory=dict, init=False, repr=False)
 
     @property
     def name(self) -> str:
         return "yara"
 
-    async def scan(self) -> list[VulnerabilityModel]:
-        """Execute YARA scan on repository."""
+    async def scan(self, full_scan: bool = False) -> list[VulnerabilityModel]:
+        """
+        Execute YARA scan on repository.
+
+        When state_path is set, files matched by the previous scan whose
+        mtime and size are unchanged reuse that scan's findings, unless
+        full_scan is set or the rules have changed since.
+        """
         if not YARA_AVAILABLE:
             print("YARA is not installed. Please install yara-python: pip install yara-python")
             return []
@@ -38,44 +141,48 @@ class YaraScanner(BaseScanner):
             return []
 
         try:
-            # Compile YARA rules
-            print(f"Compiling YARA rules from {self.rules_path}...")
-            rules = yara.compile(filepath=str(self.rules_path))
-            print("YARA rules compiled successfully")
-
-            vulnerabilities = []
-
-            # Recursively scan all files in repository
-            for root, dirs, files in os.walk(self.repo_path):
-                # Skip common non-code directories
-                dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__', '.venv', 'venv']]
-
-                for filename in files:
-                    filepath = os.path.join(root, filename)
-
-                    # Skip large files
-                    try:
-                        if os.path.getsize(filepath) > self.max_file_size:
-                            continue
-                    except OSError:
-                        continue
-
-                    # Scan file with YARA rules
-                    try:
-                        matches = rules.match(filepath)
-                        for match in matches:
-                            # Convert absolute path to relative path for consistency
-                            relative_path = os.path.relpath(filepath, self.repo_path)
-                            vuln = self._parse_yara_match(match, relative_path)
-                            vulnerabilities.append(vuln)
-                    except yara.Error:
-                        # Skip files that can't be scanned (permission errors, binary issues, etc.)
-                        continue
-                    except Exception:
-                        # Skip any other errors
-                        continue
-
-            print(f"YARA scan complete. Found {len(vulnerabilities)} matches.")
+            # File mtimes come from a coarse kernel clock, so back off a second;
+            # files modified after that are not recorded and get rescanned
+            scan_started = time.time_ns() - 1_000_000_000
+            rules_key = self._rules_key()
+            # Traversal, state I/O and rule compilation block, so run them in
+            # threads to keep the event loop free for the other scanners
+            state = {}
+            if self.state_path is not None and not full_scan:
+                state = await asyncio.to_thread(self._load_state, self.state_path, rules_key)
+            findings, fingerprints, paths = await asyncio.to_thread(self._collect_files, state)
+            failed: set[str] = set()
+
+            if paths:
+                compiled_rules_path = await asyncio.to_thread(self._compiled_rules_path)
+
+                # Matching is CPU-bound, so shard files across worker processes,
+                # each loading the precompiled rules once. Workers come from a
+                # forkserver, as forking this threaded process could deadlock
+                # them on inherited locks; only path batches are sent to them
+                loop = asyncio.get_running_loop()
+                with ProcessPoolExecutor(
+                    max_workers=os.process_cpu_count(),
+                    mp_context=multiprocessing.get_context('forkserver'),
+                    initializer=_init_worker,
+                    initargs=(str(compiled_rules_path), self.repo_path),
+                ) as pool:
+                    batch_results = await asyncio.gather(*(
+                        loop.run_in_executor(pool, _scan_batch, batch)
+                        for batch in batched(paths, YARA_BATCH_SIZE)
+                    ))
+                for batch_vulnerabilities, batch_failed in batch_results:
+                    for vuln in batch_vulnerabilities:
+                        findings[vuln.file_location].append(vuln)
+                    failed.update(batch_failed)
+
+            if self.state_path is not None:
+                await asyncio.to_thread(
+                    self._save_state, self.state_path, rules_key, scan_started, findings, fingerprints, failed
+                )
+
+            vulnerabilities = [vuln for file_vulns in findings.values() for vuln in file_vulns]
+            print(f"YARA scan complete. Scanned {len(paths)} changed files, found {len(vulnerabilities)} matches.")
             return vulnerabilities
 
         except yara.SyntaxError as e:
@@ -85,6 +192,158 @@ class YaraScanner(BaseScanner):
             print(f"YARA scan failed: {e}")
             return []
 
+    def _collect_files(
+        self, state: dict[str, Any]
+    ) -> tuple[dict[str, list[VulnerabilityModel]], dict[str, list[int]], list[tuple[str, str]]]:
+        """
+        Collect files to scan, skipping large ones.
+
+        Returns findings keyed by relative path in traversal order (pre-filled
+        from state for files matched before with the same mtime and size),
+        each file's [mtime_ns, size] fingerprint, and the (absolute, relative)
+        paths of the files that still need matching.
+        """
+        previous = state.get('files', {})
+
+        # Every traversed path starts with root + os.sep, so slice it off
+        # instead of calling os.path.relpath per file
+        root = os.path.normpath(self.repo_path)
+        prefix_len = len(root) + len(os.sep)
+
+        findings: dict[str, list[VulnerabilityModel]] = {}
+        fingerprints: dict[str, list[int]] = {}
+        paths = []
+        for filepath, st in self._iter_files(root):
+            if st.st_size > self.max_file_size:
+                continue
+            relative_path = filepath[prefix_len:]
+            fingerprint = fingerprints[relative_path] = [st.st_mtime_ns, st.st_size]
+            # Only paths recorded as matched are reused; anything else (new,
+            # changed, previously failed or skipped) is matched again
+            entry = previous.get(relative_path)
+            if entry is not None and entry['fingerprint'] == fingerprint:
+                findings[relative_path] = [
+                    VulnerabilityModel.model_validate(vuln) for vuln in entry['findings']
+                ]
+            else:
+                findings[relative_path] = []
+                paths.append((filepath, relative_path))
+        return findings, fingerprints, paths
+
+    def _rules_key(self) -> str:
+        """Identify the current rules file version by its mtime and size."""
+        st = self.rules_path.stat()
+        return f'{st.st_mtime_ns}.{st.st_size}'
+
+    def _load_state(self, state_path: Path, rules_key: str) -> dict[str, Any]:
+        """Load the previous scan state, ignoring it if missing, corrupt or made with other rules."""
+        try:
+            state = orjson.loads(state_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+        if not isinstance(state, dict) or state.get('rules') != rules_key:
+            return {}
+        return state
+
+    def _save_state(
+        self,
+        state_path: Path,
+        rules_key: str,
+        scan_started: int,
+        findings: dict[str, list[VulnerabilityModel]],
+        fingerprints: dict[str, list[int]],
+        failed: set[str],
+    ) -> None:
+        """
+        Record each matched file's fingerprint and findings for the next incremental scan.
+
+        Files that failed to scan, or were modified after the scan started,
+        are left out so the next scan matches them again.
+        """
+        state = {
+            'rules': rules_key,
+            'files': {
+                path: {
+                    'fingerprint': fingerprints[path],
+                    'findings': [vuln.model_dump() for vuln in file_vulns],
+                }
+                for path, file_vulns in findings.items()
+                if path not in failed and fingerprints[path][0] < scan_started
+            },
+        }
+        try:
+            state_path.write_bytes(orjson.dumps(state))
+        except OSError as e:
+            print(f"Could not save YARA scan state: {e}")
+
+    def _compiled_rules_path(self) -> Path:
+        """
+        Return a compiled (.yarac) copy of the rules, compiling them if needed.
+
+        The compiled rules are cached next to the source file, or under
+        YARA_COMPILED_RULES_FALLBACK_DIR when that directory is read-only,
+        keyed by the rules' mtime and size, so later scans load them
+        instead of recompiling.
+        """
+        cache_name = f'{self.rules_path.stem}.{self._rules_key()}.yarac'
+        cache_dirs = (self.rules_path.parent, YARA_COMPILED_RULES_FALLBACK_DIR)
+        for cache_dir in cache_dirs:
+            cache_path = cache_dir / cache_name
+            if cache_path.exists():
+                print(f"Using compiled YARA rules from {cache_path}")
+                return cache_path
+
+        print(f"Compiling YARA rules from {self.rules_path}...")
+        rules = yara.compile(filepath=str(self.rules_path))
+        print("YARA rules compiled successfully")
+
+        for cache_dir in cache_dirs:
+            cache_path = cache_dir / cache_name
+            try:
+                self._save_compiled_rules(rules, cache_path)
+            except (OSError, yara.Error) as e:
+                print(f"Could not save compiled YARA rules to {cache_dir}: {e}")
+                continue
+
+            # Drop compiled copies of older rule versions. A concurrent scan
+            # may have just published the current one, so never remove it
+            for stale in cache_dir.glob(f'{self.rules_path.stem}.*.yarac'):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+            return cache_path
+        raise OSError("no writable location for compiled YARA rules")
+
+    def _save_compiled_rules(self, rules: Any, cache_path: Path) -> None:
+        """Save compiled rules under a temporary name first, so concurrent scans never load a partial file."""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix='.tmp', delete=False) as tmp:
+            pass
+        try:
+            rules.save(tmp.name)
+            os.replace(tmp.name, cache_path)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    def _iter_files(self, root: str) -> Iterator[tuple[str, os.stat_result]]:
+        """Yield (path, stat) for every regular file under root, skipping excluded directories."""
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in YARA_EXCLUDED_DIRS:
+                                    stack.append(entry.path)
+                            elif entry.is_file():
+                                yield entry.path, entry.stat()
+                        except OSError:
+                            continue
+            except OSError:
+                # Unreadable directory, skip it like os.walk does
+                continue
+
     def _parse_yara_match(self, match: Any, filepath: str) -> VulnerabilityModel:
         """Convert YARA match to VulnerabilityModel with rich context."""
 
@@ -161,16 +420,12 @@ class YaraScanner(BaseScanner):
 
     def _map_yara_severity(self, score: int, tags: list[str]) -> str:
         """Map YARA rule score and tags to severity level."""
-        # Check for critical tags
-        critical_tags = {'MALWARE', 'RANSOMWARE', 'BACKDOOR', 'TROJAN'}
-        high_tags = {'EXPLOIT', 'SHELLCODE', 'SUSPICIOUS', 'WEBSHELL'}
-
         # Convert tags to uppercase for comparison
-        tags_upper = {tag.upper() for tag in tags}
+        tags_upper = {tag.upper() for tag in tags} if tags else frozenset()
 
-        if any(tag in critical_tags for tag in tags_upper) or score >= 90:
+        if score >= 90 or not tags_upper.isdisjoint(YARA_CRITICAL_TAGS):
             return 'CRITICAL'
-        elif any(tag in high_tags for tag in tags_upper) or score >= 75:
+        elif score >= 75 or not tags_upper.isdisjoint(YARA_HIGH_TAGS):
             return 'HIGH'
         elif score >= 65:
             return 'MEDIUM'
@@ -188,11 +443,8 @@ class YaraScanner(BaseScanner):
             # Convert relative path to absolute for file reading
             abs_filepath = os.path.join(self.repo_path, filepath)
 
-            with open(abs_filepath, 'rb') as f:
-                content = f.read(offset + 1000)  # Read a bit more for context
-
-            # Count newlines up to offset
-            line_number = content[:offset].count(b'\n') + 1
+            # Count newlines before offset
+            line_number = bisect.bisect_left(self._line_offsets(abs_filepath), offset) + 1
 
             # Estimate line range (match might span multiple lines)
             end_line = line_number + 5  # Assume match spans ~5 lines
@@ -200,3 +452,12 @@ class YaraScanner(BaseScanner):
             return f"{line_number}-{end_line}"
         except Exception:
             return "1-1"
+
+    def _line_offsets(self, abs_filepath: str) -> list[int]:
+        """Return the sorted byte offsets of every newline in the file, cached per file."""
+        newlines = self._line_idx_cache.get(abs_filepath)
+        if newlines is None:
+            with open(abs_filepath, 'rb') as f:
+                newlines = _find_newlines(f.read())
+            self._line_idx_cache[abs_filepath] = newlines
+        return newlines
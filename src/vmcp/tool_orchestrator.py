@@ -4,24 +4,48 @@ Groups vulnerability scan results by MCP tools instead of by scanner.
 Format: {"scanner": {"tool_name": [vulnerabilities]}}
 """
 import asyncio
-import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
-from vmcp.models import VulnerabilityModel
+import orjson
+
+from vmcp.models import VULNERABILITY_LIST_ADAPTER, VulnerabilityModel
 from vmcp.orchestrator import SCANNER_MAP, ScanOrchestrator
 from vmcp.scanners.base import BaseScanner
 from vmcp.utils.tool_detector import ToolDetector, MCPTool
 from vmcp.utils.call_graph import build_tool_call_graphs
 
+# Dependency manifests/lockfiles; findings in these go to 'dependencies'
+DEPENDENCY_FILES = frozenset({
+    'package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml',
+    'requirements.txt', 'setup.py', 'pyproject.toml', 'Pipfile', 'poetry.lock',
+    'go.mod', 'go.sum', 'Cargo.toml', 'Cargo.lock',
+    'Gemfile', 'Gemfile.lock', 'composer.json', 'composer.lock'
+})
+
 
 class ToolBasedScanOrchestrator(ScanOrchestrator):
     """Orchestrates scans and groups results by MCP tools."""
 
-    def __init__(self, repo_path: str, org_name: str, repo_name: str):
-        super().__init__(repo_path, org_name, repo_name)
+    def __init__(
+        self,
+        repo_path: str,
+        org_name: str,
+        repo_name: str,
+        tool_cache_path: str | None = None,
+        yara_state_path: str | None = None,
+    ):
+        super().__init__(repo_path, org_name, repo_name, yara_state_path)
         self.tools: list[MCPTool] = []
-        self.tool_detector = ToolDetector(repo_path)
+        # Runtime detection would start the scanned repository's MCP server,
+        # which is untrusted code; tool-based scans only use static detection
+        self.tool_detector = ToolDetector(repo_path, use_runtime_detection=False, cache_path=tool_cache_path)
+        self.tool_call_graphs: dict[str, frozenset[str]] = {}
+        # Inverted call graphs: file path -> first tool depending on it
+        self.file_to_tool: dict[str, str] = {}
 
     async def run_all_scanners_by_tool(
         self, scanner_names: list[str] | None = None
@@ -38,6 +62,23 @@ class ToolBasedScanOrchestrator(ScanOrchestrator):
                 ...
             }
         """
+        # Static tool detection and call graph building are synchronous, so run
+        # them in a thread while the scanner subprocesses are already going
+        scanner_results, _ = await asyncio.gather(
+            self.run_all_scanners(scanner_names),
+            asyncio.to_thread(self._analyze_tools),
+        )
+
+        # Group results by tool
+        tool_grouped_results: dict[str, dict[str, list[VulnerabilityModel]]] = {}
+
+        for scanner_name, vulnerabilities in scanner_results.items():
+            tool_grouped_results[scanner_name] = self._group_by_tool(vulnerabilities)
+
+        return tool_grouped_results
+
+    def _analyze_tools(self) -> None:
+        """Detect tools and build their call graphs, indexed by file path."""
         # First, detect tools in the repository
         self.tools = self.tool_detector.detect_tools()
 
@@ -48,19 +89,11 @@ class ToolBasedScanOrchestrator(ScanOrchestrator):
         # Build call graphs for each tool to track dependencies
         print("Building call graphs for tools...")
         self.tool_call_graphs = build_tool_call_graphs(self.tools, self.repo_path)
+        self.file_to_tool = {}
         for tool_name, dependencies in self.tool_call_graphs.items():
             print(f"  {tool_name} depends on {len(dependencies)} files")
-
-        # Run all scanners normally
-        scanner_results = await self.run_all_scanners(scanner_names)
-
-        # Group results by tool
-        tool_grouped_results: dict[str, dict[str, list[VulnerabilityModel]]] = {}
-
-        for scanner_name, vulnerabilities in scanner_results.items():
-            tool_grouped_results[scanner_name] = self._group_by_tool(vulnerabilities)
-
-        return tool_grouped_results
+            for file_path in dependencies:
+                self.file_to_tool.setdefault(file_path, tool_name)
 
     def _group_by_tool(
         self, vulnerabilities: list[VulnerabilityModel]
@@ -77,23 +110,11 @@ class ToolBasedScanOrchestrator(ScanOrchestrator):
         - Direct file match: vuln in server.py → tool in server.py
         - Transitive match: vuln in helper.py → tool that imports helper.py
         """
-        tool_vulns: dict[str, list[VulnerabilityModel]] = {}
-
-        # Initialize with detected tools
-        for tool in self.tools:
-            tool_vulns[tool.name] = []
-
-        # Special categories
-        tool_vulns['dependencies'] = []
-        tool_vulns['unknown'] = []
+        # Buckets are created on first use, so tools without findings never appear
+        tool_vulns: defaultdict[str, list[VulnerabilityModel]] = defaultdict(list)
 
-        # Dependency file patterns
-        dependency_files = {
-            'package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml',
-            'requirements.txt', 'setup.py', 'pyproject.toml', 'Pipfile', 'poetry.lock',
-            'go.mod', 'go.sum', 'Cargo.toml', 'Cargo.lock',
-            'Gemfile', 'Gemfile.lock', 'composer.json', 'composer.lock'
-        }
+        # Normalized repo prefix stripped from absolute file locations
+        repo_prefix = os.path.normpath(self.repo_path) + os.sep
 
         for vuln in vulnerabilities:
             assigned = False
@@ -103,28 +124,23 @@ class ToolBasedScanOrchestrator(ScanOrchestrator):
                 # Normalize path - handle both absolute and relative paths
                 file_path = vuln.file_location
 
-                # If it's an absolute path, make it relative to repo_path
-                if Path(file_path).is_absolute():
-                    try:
-                        file_path = str(Path(file_path).relative_to(self.repo_path))
-                    except ValueError:
-                        # Path is absolute but not under repo_path, try string replacement
-                        file_path = file_path.replace(f"{self.repo_path}/", "")
+                # If it's an absolute path under repo_path, make it relative
+                if file_path.startswith(repo_prefix):
+                    file_path = file_path[len(repo_prefix):]
 
-                file_name = Path(file_path).name
+                file_name = os.path.basename(file_path)
 
                 # Check if it's a dependency file - these go to 'dependencies' category
-                if file_name in dependency_files:
+                if file_name in DEPENDENCY_FILES:
                     tool_vulns['dependencies'].append(vuln)
                     assigned = True
                 else:
                     # Use call graph to check if file is in any tool's dependency tree
                     # This catches both direct matches and transitive dependencies
-                    for tool_name, dependencies in self.tool_call_graphs.items():
-                        if file_path in dependencies:
-                            tool_vulns[tool_name].append(vuln)
-                            assigned = True
-                            break
+                    tool_name = self.file_to_tool.get(file_path)
+                    if tool_name is not None:
+                        tool_vulns[tool_name].append(vuln)
+                        assigned = True
 
             # Vulnerabilities with no file location go to dependencies (usually dependency CVEs)
             if not assigned and not vuln.file_location:
@@ -135,10 +151,7 @@ class ToolBasedScanOrchestrator(ScanOrchestrator):
             if not assigned:
                 tool_vulns['unknown'].append(vuln)
 
-        # Remove empty tool categories
-        tool_vulns = {k: v for k, v in tool_vulns.items() if v}
-
-        return tool_vulns
+        return dict(tool_vulns)
 
     def save_tool_results(
         self, results: dict[str, dict[str, list[VulnerabilityModel]]], output_dir: str
@@ -153,25 +166,40 @@ class ToolBasedScanOrchestrator(ScanOrchestrator):
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Save scanner-specific tool results to avoid parallel overwrite
-        for scanner, tool_vulns in results.items():
-            formatted_tool_results: dict[str, list[dict]] = {}
-            for tool_name, vulnerabilities in tool_vulns.items():
-                formatted_tool_results[tool_name] = [
-                    vuln.model_dump(mode='json') for vuln in vulnerabilities
+        # Save scanner-specific tool results to avoid parallel overwrite.
+        # Each scanner's file is dumped and written on its own thread.
+        if results:
+            with ThreadPoolExecutor(max_workers=min(8, len(results))) as executor:
+                futures = [
+                    executor.submit(self._write_scanner_file, output_path, scanner, tool_vulns)
+                    for scanner, tool_vulns in results.items()
                 ]
-
-            # Save to scanner-specific file
-            scanner_file = output_path / f'{scanner}-tool-violations.json'
-            with open(scanner_file, 'w') as f:
-                json.dump({scanner: formatted_tool_results}, f, indent=2, default=str)
-
-            print(f"Tool-based results for {scanner} saved to {scanner_file}")
+                for future in futures:
+                    future.result()
 
         # Save tool metadata to scanner-specific file (will be merged during aggregation)
         tools_metadata_file = output_path / f'{self.org_name}-{self.repo_name}-tools-metadata.json'
         tools_data = [tool.to_dict() for tool in self.tools]
-        with open(tools_metadata_file, 'w') as f:
-            json.dump(tools_data, f, indent=2)
+        with open(tools_metadata_file, 'wb') as f:
+            f.write(orjson.dumps(tools_data, option=orjson.OPT_INDENT_2))
 
         print(f"Tool metadata saved to {tools_metadata_file}")
+
+    def _write_scanner_file(
+        self, output_path: Path, scanner: str, tool_vulns: dict[str, list[VulnerabilityModel]]
+    ) -> None:
+        """Write one scanner's tool-grouped results to <scanner>-tool-violations.json."""
+        # Dump each tool's list in one pydantic-core call; datetimes are left
+        # as-is for orjson to serialize natively
+        formatted_tool_results: dict[str, list[dict]] = {}
+        for tool_name, vulnerabilities in tool_vulns.items():
+            formatted_tool_results[tool_name] = VULNERABILITY_LIST_ADAPTER.dump_python(vulnerabilities)
+
+        scanner_file = output_path / f'{scanner}-tool-violations.json'
+        with open(scanner_file, 'wb') as f:
+            f.write(orjson.dumps(
+                {scanner: formatted_tool_results},
+                option=orjson.OPT_INDENT_2 | orjson.OPT_UTC_Z,
+            ))
+
+        print(f"Tool-based results for {scanner} saved to {scanner_file}")
@@ -1,20 +1,26 @@
 """Aggregate vulnerability scan results and generate README."""
-import json
+import hashlib
+import operator
+import os
+import sys
+from collections import Counter
+from collections.abc import Callable, Container, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
+import orjson
+
+from vmcp.models import SEVERITY_PRIORITY
 from vmcp.orchestrator import SCANNER_MAP
 
 
-SEVERITY_ORDER = {
-    'CRITICAL': 0,
-    'HIGH': 1,
-    'MEDIUM': 2,
-    'LOW': 3,
-    'UNKNOWN': 4,
-    'WARNING': 5,
-    'NONE': 6,
-}
+# Single source of truth for severity ranking, shared with the scanners
+SEVERITY_ORDER = SEVERITY_PRIORITY
+
+# Severity names indexed by their SEVERITY_ORDER priority
+SEVERITY_BY_PRIORITY = tuple(sorted(SEVERITY_ORDER, key=SEVERITY_ORDER.__getitem__))
 
 SEVERITY_EMOJI = {
     'CRITICAL': '🔴',
@@ -26,26 +32,55 @@ SEVERITY_EMOJI = {
     'NONE': '🟢',
 }
 
-TEMP_SCANNER_FILE_NAMES = [f"{scanner}-violations.json" for scanner in SCANNER_MAP]
+# (severity, status emoji) indexed by SEVERITY_ORDER priority
+SEVERITY_META = tuple((severity, SEVERITY_EMOJI[severity]) for severity in SEVERITY_BY_PRIORITY)
 
+# Bound lookup for the per-finding hot loops. SEVERITY_ORDER is keyed by
+# VulnerabilitySeverity members; re-keying by interned plain strings lets
+# CPython use its exact-str dict lookup for the severities read from JSON.
+_SEV_ORDER_GET = {sys.intern(str(severity)): priority for severity, priority in SEVERITY_ORDER.items()}.get
 
-def get_worst_severity(vulnerabilities: list[dict[str, Any]]) -> str:
-    """Get the worst (highest priority) severity from a list of findings."""
-    if not vulnerabilities:
-        return 'NONE'
+# Bump whenever the rendered summaries change (layout, sort order, emoji),
+# so write_summary regenerates reports made by an older version
+SUMMARY_FORMAT_VERSION = 1
 
-    worst_severity = 'NONE'
-    worst_priority = SEVERITY_ORDER.get(worst_severity, 999)
+SUMMARY_TABLE_HEADER = (
+    "# Vulnerability Scan Results",
+    "",
+    "| Project | Results | Total | Critical | High | Medium | Low | Fixable | Scanners | Status |",
+    "|---------|---------|-------|----------|------|--------|-----|---------|----------|--------|",
+)
+
+# One SummaryRow: links to the original GitHub repository and the violations file
+SUMMARY_ROW_FORMAT = (
+    "| [{0.org_repo}](https://github.com/{0.org_repo}) | [📋](results/{0.filename}) | {0.total} | "
+    "{0.critical} | {0.high} | {0.medium} | {0.low} | {0.fixable} | {0.scanners} | {0.status} |"
+)
+
+TEMP_SCANNER_FILE_NAMES = frozenset(f"{scanner}-violations.json" for scanner in SCANNER_MAP)
 
-    for vuln in vulnerabilities:
-        severity = vuln.get('severity', 'UNKNOWN')
-        priority = SEVERITY_ORDER.get(severity, 999)
 
+def get_worst_severity(vulnerabilities: list[dict[str, Any]]) -> str:
+    """Get the worst (highest priority) severity from a list of findings."""
+    # Unrecognized severities rank below NONE and so never count as worst
+    worst_priority = SEVERITY_ORDER['NONE']
+    for vuln in vulnerabilities:
+        priority = _SEV_ORDER_GET(vuln.get('severity', 'UNKNOWN'), 999)
         if priority < worst_priority:
-            worst_severity = severity
+            if priority == 0:
+                # Nothing ranks above CRITICAL, so stop scanning
+                return SEVERITY_BY_PRIORITY[0]
             worst_priority = priority
+    return SEVERITY_BY_PRIORITY[worst_priority]
 
-    return worst_severity
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    """Read and parse a JSON results file, or return None if it does not exist."""
+    # Read directly rather than exists() + read to save a stat per file
+    try:
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
 
 
 def aggregate_results(org_name: str, repo_name: str, results_dir: str) -> dict[str, Any]:
@@ -54,24 +89,20 @@ def aggregate_results(org_name: str, repo_name: str, results_dir: str) -> dict[s
 
     New format: {"scanner_name": [vulns]}
     """
-    aggregated = {}
     results_path = Path(results_dir)
 
-    # Load existing per-repo file in new format: org-repo-violations.json
-    per_repo_file = results_path / f'{org_name}-{repo_name}-violations.json'
-    if per_repo_file.exists():
-        with open(per_repo_file, 'r') as f:
-            aggregated = json.load(f)
+    # Existing per-repo file in new format (org-repo-violations.json), followed
+    # by the scanner-specific temporary files from new scans
+    files = [results_path / f'{org_name}-{repo_name}-violations.json']
+    files.extend(results_path / f'{scanner_name}-violations.json' for scanner_name in SCANNER_MAP)
 
-    # Load scanner-specific temporary files from new scans
-    for scanner_name in SCANNER_MAP.keys():
-        scanner_file = results_path / f'{scanner_name}-violations.json'
-        if scanner_file.exists():
-            with open(scanner_file, 'r') as f:
-                scanner_data = json.load(f)
-                # Merge scanner results
-                for scanner, vulns in scanner_data.items():
-                    aggregated[scanner] = vulns
+    # Read and parse the files concurrently; map() keeps their order, so the
+    # merge below stays single-threaded and newer scanner results still win
+    aggregated = {}
+    with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+        for data in executor.map(_read_json, files):
+            if data is not None:
+                aggregated.update(data)
 
     return aggregated
 
@@ -87,53 +118,116 @@ def save_aggregated_results(org_name: str, repo_name: str, results: dict[str, An
 
     # Save to org-repo-violations.json
     violations_file = results_path / f'{org_name}-{repo_name}-violations.json'
-    with open(violations_file, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    with open(violations_file, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
 
     print(f"Saved results to {violations_file}")
 
     # Remove scanner-specific temporary files
     for scanner_name in SCANNER_MAP.keys():
         temp_file = results_path / f'{scanner_name}-violations.json'
-        if temp_file.exists():
+        try:
             temp_file.unlink()
-            print(f"Removed temporary scanner file: {temp_file}")
+        except FileNotFoundError:
+            continue
+        print(f"Removed temporary scanner file: {temp_file}")
+
+
+class SummaryRow(NamedTuple):
+    """One repository's row in the README summary table."""
+
+    sort_key: tuple[int, str]
+    org_repo: str
+    filename: str
+    total: int
+    critical: int
+    high: int
+    medium: int
+    low: int
+    fixable: int
+    scanners: str
+    status: str
 
 
 def count_by_severity(vulnerabilities: list[dict[str, Any]]) -> dict[str, int]:
     """Count vulnerabilities by severity."""
+    counts = Counter(vuln.get('severity', 'UNKNOWN') for vuln in vulnerabilities)
+    return {severity: counts[severity] for severity in ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')}
+
+
+def count_fixable(vulnerabilities: list[dict[str, Any]]) -> int:
+    """Count vulnerabilities with available fixes."""
+    # map(bool, ...) keeps the counting loop in C
+    return sum(map(bool, map(operator.methodcaller('get', 'fixed_version'), vulnerabilities)))
+
+
+def summarize_vulnerabilities(
+    vulnerabilities: Iterable[dict[str, Any]],
+) -> tuple[int, int, dict[str, int], int]:
+    """
+    Summarize findings in a single pass.
+
+    Accepts any iterable, so callers can chain scanner lists without copying them.
+    Returns (total, worst priority, severity counts, fixable count), matching
+    len(), get_worst_severity, count_by_severity and count_fixable combined.
+    The worst priority indexes SEVERITY_META.
+    """
     counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
-    for vuln in vulnerabilities:
+    worst_priority = SEVERITY_ORDER['NONE']
+    fixable = 0
+    total = 0
+
+    findings = iter(vulnerabilities)
+    for vuln in findings:
+        total += 1
         severity = vuln.get('severity', 'UNKNOWN')
         if severity in counts:
             counts[severity] += 1
-    return counts
+        if vuln.get('fixed_version'):
+            fixable += 1
+        priority = _SEV_ORDER_GET(severity, 999)
+        if priority < worst_priority:
+            worst_priority = priority
+            if priority == 0:
+                # Nothing ranks above CRITICAL; count the rest without ranking them
+                break
 
+    for vuln in findings:
+        total += 1
+        severity = vuln.get('severity', 'UNKNOWN')
+        if severity in counts:
+            counts[severity] += 1
+        if vuln.get('fixed_version'):
+            fixable += 1
 
-def count_fixable(vulnerabilities: list[dict[str, Any]]) -> int:
-    """Count vulnerabilities with available fixes."""
-    return sum(1 for vuln in vulnerabilities if vuln.get('fixed_version'))
+    return total, worst_priority, counts, fixable
 
 
-def get_scanners_used(scanners: dict[str, list]) -> str:
-    """Get list of scanners that were used."""
-    scanner_names = sorted(scanners.keys())
-    return ', '.join(scanner_names) if scanner_names else 'None'
+def scan_results_dir(
+    results_dir: str, suffix: str, exclude: Container[str] = frozenset()
+) -> list[os.DirEntry]:
+    """
+    List the files directly in results_dir whose names end with suffix.
 
+    A single os.scandir pass filtered on entry names; DirEntry carries the
+    file type from readdir, so no per-entry stat or Path object is needed.
+    Names in exclude are rejected during the scan itself.
+    """
+    with os.scandir(results_dir) as entries:
+        return [
+            entry for entry in entries
+            if entry.name.endswith(suffix) and entry.name not in exclude and entry.is_file()
+        ]
 
-def generate_summary_table(results_dir: str) -> str:
-    """Generate summary table for README by iterating through all violations files."""
-    rows = []
-    results_path = Path(results_dir)
 
-    # Iterate through all org-repo-violations.json files
-    for json_file in results_path.glob('*-*-violations.json'):
-        # Skip temp scanner files
-        if json_file.name in TEMP_SCANNER_FILE_NAMES:
-            continue
+def iter_summary_lines(results_dir: str) -> Iterator[str]:
+    """Yield the README summary table line by line from all violations files."""
+    rows = []
 
+    # Iterate through all org-repo-violations.json files, skipping temp scanner files
+    for json_file in scan_results_dir(results_dir, '-violations.json', exclude=TEMP_SCANNER_FILE_NAMES):
         # Extract org/repo from filename: org-repo-violations.json -> org/repo
-        filename_parts = json_file.stem.replace('-violations', '').split('-', 1)
+        filename_parts = json_file.name.removesuffix('.json').replace('-violations', '').split('-', 1)
         if len(filename_parts) != 2:
             continue
 
@@ -141,71 +235,112 @@ def generate_summary_table(results_dir: str) -> str:
         org_repo = f"{org_name}/{repo_name}"
 
         # Load scanner results (new format: {"scanner": [vulns]})
-        with open(json_file, 'r') as f:
-            scanners = json.load(f)
+        with open(json_file.path, 'rb') as f:
+            scanners = orjson.loads(f.read())
 
-        # Collect all vulnerabilities across scanners
-        all_vulnerabilities = []
-        for scanner_vulns in scanners.values():
-            all_vulnerabilities.extend(scanner_vulns)
+        # Total, worst severity, severity breakdown and fixable count in one
+        # pass over all scanners' findings
+        total_findings, severity_priority, severity_counts, fixable_count = summarize_vulnerabilities(
+            chain.from_iterable(scanners.values())
+        )
+        _, status_emoji = SEVERITY_META[severity_priority]
 
-        total_findings = len(all_vulnerabilities)
-        worst_severity = get_worst_severity(all_vulnerabilities)
-        severity_priority = SEVERITY_ORDER.get(worst_severity, 999)
-        status_emoji = SEVERITY_EMOJI.get(worst_severity, '⚪')
+        # Get scanners used
+        scanners_used = ', '.join(sorted(scanners)) if scanners else 'None'
 
-        # Get severity breakdown
-        severity_counts = count_by_severity(all_vulnerabilities)
+        # Store row data with sort key
+        rows.append(SummaryRow(
+            sort_key=(-severity_priority, org_repo),  # Best first, then alphabetical
+            org_repo=org_repo,
+            filename=json_file.name,  # The file this row was read from
+            total=total_findings,
+            critical=severity_counts['CRITICAL'],
+            high=severity_counts['HIGH'],
+            medium=severity_counts['MEDIUM'],
+            low=severity_counts['LOW'],
+            fixable=fixable_count,
+            scanners=scanners_used,
+            status=status_emoji,
+        ))
+
+    # Sort rows by severity (best first), then by name; attrgetter keeps the
+    # key extraction in C
+    rows.sort(key=operator.attrgetter('sort_key'))
+
+    # Header plus one line per row
+    yield from SUMMARY_TABLE_HEADER
+    yield from map(SUMMARY_ROW_FORMAT.format, rows)
 
-        # Count fixable vulnerabilities
-        fixable_count = count_fixable(all_vulnerabilities)
 
-        # Get scanners used
-        scanners_used = get_scanners_used(scanners)
+def generate_summary_table(results_dir: str) -> str:
+    """Generate summary table for README by iterating through all violations files."""
+    return "\n".join(iter_summary_lines(results_dir))
 
-        # Store row data with sort key
-        rows.append({
-            'org_repo': org_repo,
-            'filename': f'{org_name}-{repo_name}-violations.json',
-            'total': total_findings,
-            'severity_counts': severity_counts,
-            'fixable': fixable_count,
-            'scanners': scanners_used,
-            'status': status_emoji,
-            'sort_key': (-severity_priority, org_repo)  # Best first, then alphabetical
-        })
-
-    # Sort rows by severity (best first), then by name
-    rows.sort(key=lambda r: r['sort_key'])
-
-    # Generate table lines
-    lines = [
-        "# Vulnerability Scan Results",
-        "",
-        "| Project | Results | Total | Critical | High | Medium | Low | Fixable | Scanners | Status |",
-        "|---------|---------|-------|----------|------|--------|-----|---------|----------|--------|",
-    ]
-
-    for row in rows:
-        # Link to original GitHub repository
-        repo_link = f"[{row['org_repo']}](https://github.com/{row['org_repo']})"
-
-        # Link to violations file
-        violations_link = f"[📋](results/{row['filename']})"
-
-        lines.append(
-            f"| {repo_link} | {violations_link} | {row['total']} | "
-            f"{row['severity_counts']['CRITICAL']} | {row['severity_counts']['HIGH']} | "
-            f"{row['severity_counts']['MEDIUM']} | {row['severity_counts']['LOW']} | "
-            f"{row['fixable']} | {row['scanners']} | {row['status']} |"
-        )
 
-    return "\n".join(lines)
+def write_markdown(path: str, lines: Iterable[str]) -> None:
+    """
+    Stream newline-separated lines to a UTF-8 markdown file.
 
+    Lines are written through a 1 MiB buffer as they are produced, so the
+    full report is never joined into one string in memory. They go to
+    <path>.tmp first and are renamed into place, so a failure part-way
+    through never leaves a truncated report behind.
+    """
+    tmp_path = f'{path}.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        with open(fd, 'wb', buffering=1 << 20) as f:
+            separator = b''
+            for line in lines:
+                f.write(separator)
+                f.write(line.encode('utf-8'))
+                separator = b'\n'
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def results_dir_key(results_dir: str, suffix: str, render: Callable[[str], Iterable[str]]) -> str:
+    """
+    Fingerprint the files in results_dir whose names end with suffix.
 
-def main():
-    import sys
+    Hashes SUMMARY_FORMAT_VERSION and the renderer's name, then each file's
+    name, size and mtime in name order, so a new report format or any added,
+    removed or rewritten results file changes the key.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{SUMMARY_FORMAT_VERSION}\0{render.__module__}.{render.__qualname__}\n'.encode())
+    for entry in sorted(scan_results_dir(results_dir, suffix), key=operator.attrgetter('name')):
+        stat = entry.stat()
+        digest.update(f'{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
 
+
+def write_summary(
+    path: str, results_dir: str, suffix: str, render: Callable[[str], Iterable[str]]
+) -> bool:
+    """
+    Write render(results_dir) to path unless it and the results files are unchanged.
+
+    The results_dir_key of the last write is kept in <path>.cachekey; when it
+    still matches and path exists, the report is left as is. Returns True if
+    the report was regenerated.
+    """
+    key = results_dir_key(results_dir, suffix, render)
+    key_path = Path(f'{path}.cachekey')
+    try:
+        if os.path.exists(path) and key_path.read_text() == key:
+            return False
+    except FileNotFoundError:
+        pass
+
+    write_markdown(path, render(results_dir))
+    key_path.write_text(key)
+    return True
+
+
+def main():
     if len(sys.argv) < 4:
         print("Usage: aggregate_results.py <org_name> <repo_name> <results_dir>")
         sys.exit(1)
@@ -220,14 +355,12 @@ def main():
     # Save aggregated results
     save_aggregated_results(org_name, repo_name, results, results_dir)
 
-    # Generate full summary table from all repo files
-    summary = generate_summary_table(results_dir)
-
-    # Write to SCAN_RESULTS.md
-    with open('SCAN_RESULTS.md', 'w') as f:
-        f.write(summary)
-
-    print("Generated SCAN_RESULTS.md with vulnerability summary")
+    # Generate full summary table from all repo files and write to SCAN_RESULTS.md,
+    # unless no violations file changed since it was last written
+    if write_summary('SCAN_RESULTS.md', results_dir, '-violations.json', iter_summary_lines):
+        print("Generated SCAN_RESULTS.md with vulnerability summary")
+    else:
+        print("SCAN_RESULTS.md is up to date")
 
 
 if __name__ == '__main__':
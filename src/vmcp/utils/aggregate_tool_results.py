@@ -1,22 +1,100 @@
 """Aggregate tool-based vulnerability scan results and generate SCAN_RESULTS_TOOLS.md."""
-import json
+import operator
+import os
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
+
+import orjson
 
 from vmcp.utils.aggregate_results import (
-    SEVERITY_ORDER,
-    SEVERITY_EMOJI,
-    get_worst_severity,
-    count_by_severity,
-    count_fixable,
+    SEVERITY_META,
+    scan_results_dir,
+    summarize_vulnerabilities,
+    write_summary,
 )
 
+# Suffix of the per-scanner files written by ToolBasedScanOrchestrator
+TOOL_VIOLATIONS_SUFFIX = '-tool-violations.json'
+
+# Per-tool metadata keys in org-repo-tools.json; every other key is a scanner
+TOOL_METADATA_FIELDS = frozenset({'file_path', 'description', 'line_number', 'language'})
+
+# Non-scanner keys of an entry returned by aggregate_tool_results
+_TOOL_ENTRY_FIELDS = TOOL_METADATA_FIELDS | {'name'}
+
+TOOL_SUMMARY_TABLE_HEADER = (
+    "# Vulnerability Scan Results by Tool",
+    "",
+    "This report shows vulnerabilities grouped by MCP tools.",
+    "",
+    "| Project | MCP Tools | Results | Total | Critical | High | Medium | Low | Fixable | Scanners | Status |",
+    "|---------|-----------|---------|-------|----------|------|--------|-----|---------|----------|--------|",
+)
+
+# One ToolSummaryRow: links to the original GitHub repository and the results file
+TOOL_SUMMARY_ROW_FORMAT = (
+    "| [{0.org_repo}](https://github.com/{0.org_repo}) | {0.tools} | "
+    "[📋 View](results_tools/{0.filename}) | {0.total} | "
+    "{0.critical} | {0.high} | {0.medium} | {0.low} | {0.fixable} | {0.scanners} | {0.status} |"
+)
 
-def aggregate_tool_results(org_name: str, repo_name: str, results_dir: str) -> list[dict[str, Any]]:
+
+def _load_json(path: str) -> Any:
+    """Read and parse a JSON results file."""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _load_tools_file(path: str) -> dict[str, Any] | None:
+    """
+    Read and parse an org-repo-tools.json file.
+
+    Returns None without parsing when the file holds no findings at all.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Every saved finding carries a severity, so a file without the key has
+    # nothing to summarize and can skip JSON decoding
+    if b'"severity"' not in data:
+        return None
+    return orjson.loads(data)
+
+
+class ToolSummaryRow(NamedTuple):
+    """One repository's row in the tool-based summary table."""
+
+    sort_key: tuple[int, int, str]
+    org_repo: str
+    tools: str
+    tool_count: int
+    deps_count: int
+    unknown_count: int
+    filename: str
+    total: int
+    critical: int
+    high: int
+    medium: int
+    low: int
+    fixable: int
+    scanners: str
+    status: str
+
+
+def aggregate_tool_results(
+    org_name: str,
+    repo_name: str,
+    results_dir: str,
+    scanner_files: list[os.DirEntry] | None = None,
+) -> list[dict[str, Any]]:
     """
     Aggregate tool-based scanner results for a specific repository.
 
     Merges scanner-specific *-tool-violations.json files into a single tools file.
+    Pass scanner_files (from scan_results_dir) to reuse an earlier directory scan.
     Format: [
         {
             "name": "tool_name",
@@ -38,16 +116,22 @@ def aggregate_tool_results(org_name: str, repo_name: str, results_dir: str) -> l
         print(f"No tool metadata found at {metadata_file}")
         return []
 
-    with open(metadata_file, 'r') as f:
-        tools_metadata = json.load(f)
+    tools_metadata = orjson.loads(metadata_file.read_bytes())
 
     # Find all scanner-specific tool-violations files
-    scanner_files = list(results_path.glob('*-tool-violations.json'))
+    if scanner_files is None:
+        scanner_files = scan_results_dir(results_dir, TOOL_VIOLATIONS_SUFFIX)
 
     if not scanner_files:
         print(f"No scanner-specific tool-violations files found in {results_dir}")
         return []
 
+    # Start reading and parsing the scanner files on a thread pool; they are
+    # merged in order below once the tool metadata is laid out
+    executor = ThreadPoolExecutor(max_workers=min(32, len(scanner_files)))
+    pending = [executor.submit(_load_json, scanner_file.path) for scanner_file in scanner_files]
+    executor.shutdown(wait=False)
+
     # Build tool-based aggregation
     tools_dict: dict[str, dict[str, Any]] = {}
 
@@ -79,51 +163,54 @@ def aggregate_tool_results(org_name: str, repo_name: str, results_dir: str) -> l
     }
 
     # Merge scanner results into tools
-    for scanner_file in scanner_files:
+    for scanner_file, future in zip(scanner_files, pending):
         try:
-            with open(scanner_file, 'r') as f:
-                scanner_data = json.load(f)
+            scanner_data = future.result()
 
             # Each file contains {"scanner_name": {"tool_name": [vulns]}}
             for scanner_name, tool_results in scanner_data.items():
                 for tool_name, vulns in tool_results.items():
-                    if tool_name in tools_dict:
-                        tools_dict[tool_name][scanner_name] = vulns
-                    else:
+                    tool_entry = tools_dict.get(tool_name)
+                    if tool_entry is None:
                         # Tool not in metadata, add as unknown
-                        if tool_name not in tools_dict:
-                            tools_dict[tool_name] = {
-                                'name': tool_name,
-                                'file_path': '',
-                                'description': '',
-                                'line_number': None,
-                                'language': 'unknown'
-                            }
-                        tools_dict[tool_name][scanner_name] = vulns
+                        tool_entry = tools_dict[tool_name] = {
+                            'name': tool_name,
+                            'file_path': '',
+                            'description': '',
+                            'line_number': None,
+                            'language': 'unknown'
+                        }
+                    tool_entry[scanner_name] = vulns
 
             print(f"Merged {scanner_file.name}")
 
         except Exception as e:
-            print(f"Error reading {scanner_file}: {e}")
+            print(f"Error reading {scanner_file.path}: {e}")
             continue
 
     # Remove empty tools (no scanner results)
     tools_list = []
-    for tool_name, tool_data in tools_dict.items():
+    for tool_data in tools_dict.values():
         # Check if tool has any scanner results
-        has_results = any(k for k in tool_data.keys() if k not in ['name', 'file_path', 'description', 'line_number', 'language'])
-        if has_results:
+        if tool_data.keys() - _TOOL_ENTRY_FIELDS:
             tools_list.append(tool_data)
 
     return tools_list
 
 
 def save_tool_results(
-    org_name: str, repo_name: str, results: list[dict[str, Any]], results_dir: str
+    org_name: str,
+    repo_name: str,
+    results: list[dict[str, Any]],
+    results_dir: str,
+    scanner_files: list[os.DirEntry] | None = None,
 ) -> None:
     """
     Save aggregated tool-based results to per-repo tools.json file.
 
+    The scanner-specific files are deleted afterwards; pass the scanner_files
+    given to aggregate_tool_results to skip listing the directory again.
+
     Format: {
         "tool_name": {"file_path": "...", "description": "...", "scanner1": [vulns], ...},
         "dependencies": {"file_path": "", "description": "...", "trivy": [vulns], ...},
@@ -141,17 +228,18 @@ def save_tool_results(
 
     # Save to org-repo-tools.json
     tools_file = results_path / f'{org_name}-{repo_name}-tools.json'
-    with open(tools_file, 'w') as f:
-        json.dump(tools_dict, f, indent=2, default=str)
+    with open(tools_file, 'wb') as f:
+        f.write(orjson.dumps(tools_dict, option=orjson.OPT_INDENT_2))
 
     print(f"Saved tool-based results to {tools_file}")
 
     # Clean up scanner-specific files
-    scanner_files = list(results_path.glob('*-tool-violations.json'))
+    if scanner_files is None:
+        scanner_files = scan_results_dir(results_dir, TOOL_VIOLATIONS_SUFFIX)
     metadata_file = results_path / f'{org_name}-{repo_name}-tools-metadata.json'
 
     for file in scanner_files:
-        file.unlink()
+        os.unlink(file.path)
         print(f"Deleted {file.name}")
 
     if metadata_file.exists():
@@ -159,19 +247,18 @@ def save_tool_results(
         print(f"Deleted {metadata_file.name}")
 
 
-def generate_tool_summary_table(results_dir: str) -> str:
+def iter_tool_summary_lines(results_dir: str) -> Iterator[str]:
     """
-    Generate summary table for SCAN_RESULTS_TOOLS.md.
+    Yield the SCAN_RESULTS_TOOLS.md summary table line by line.
 
     One row per repository showing all tools scanned.
     """
     rows = []
-    results_path = Path(results_dir)
 
     # Iterate through all org-repo-tools.json files
-    for json_file in results_path.glob('*-*-tools.json'):
+    for json_file in scan_results_dir(results_dir, '-tools.json'):
         # Extract org/repo from filename
-        filename_parts = json_file.stem.replace('-tools', '').split('-', 1)
+        filename_parts = json_file.name.removesuffix('.json').replace('-tools', '').split('-', 1)
         if len(filename_parts) != 2:
             continue
 
@@ -179,54 +266,46 @@ def generate_tool_summary_table(results_dir: str) -> str:
         org_repo = f"{org_name}/{repo_name}"
 
         # Load tool-based results (now a dict with tool names as keys)
-        with open(json_file, 'r') as f:
-            tools_data = json.load(f)
+        tools_data = _load_tools_file(json_file.path)
+        if tools_data is None:
+            continue  # Skip repos with no vulnerabilities
 
-        # Separate actual MCP tools from virtual categories
-        actual_tools = []
-        dependencies_entry = None
-        unknown_entry = None
+        # One pass over the entries: collect every scanner's findings, the
+        # actual MCP tool names and the virtual categories' finding counts
+        tool_names = []
+        scanner_lists = []
+        all_scanners = set()
+        deps_count = 0
+        unknown_count = 0
 
         for tool_name, tool_data in tools_data.items():
+            # Scanner keys are everything except the metadata fields
+            scanner_keys = tool_data.keys() - TOOL_METADATA_FIELDS
+            all_scanners.update(scanner_keys)
+            tool_lists = [tool_data[scanner_key] for scanner_key in scanner_keys]
+            scanner_lists.extend(tool_lists)
+
             if tool_name == 'dependencies':
-                dependencies_entry = tool_data
+                deps_count = sum(map(len, tool_lists))
             elif tool_name == 'unknown':
-                unknown_entry = tool_data
+                unknown_count = sum(map(len, tool_lists))
             else:
                 # Actual MCP tool
-                actual_tools.append({'name': tool_name, **tool_data})
+                tool_names.append(tool_name)
 
-        # Collect all vulnerabilities across all categories
-        all_vulnerabilities = []
-        all_scanners = set()
-
-        for tool_name, tool_data in tools_data.items():
-            # Get all scanner keys (exclude metadata fields)
-            scanner_keys = [k for k in tool_data.keys() if k not in ['file_path', 'description', 'line_number', 'language']]
-            all_scanners.update(scanner_keys)
-
-            for scanner_key in scanner_keys:
-                all_vulnerabilities.extend(tool_data[scanner_key])
+        # Total, worst severity, severity breakdown and fixable count in one pass
+        total_findings, severity_priority, severity_counts, fixable_count = summarize_vulnerabilities(
+            chain.from_iterable(scanner_lists)
+        )
 
-        if not all_vulnerabilities:
+        if not total_findings:
             continue  # Skip repos with no vulnerabilities
-
-        total_findings = len(all_vulnerabilities)
-        worst_severity = get_worst_severity(all_vulnerabilities)
-        severity_priority = SEVERITY_ORDER.get(worst_severity, 999)
-        status_emoji = SEVERITY_EMOJI.get(worst_severity, '⚪')
-
-        # Get severity breakdown
-        severity_counts = count_by_severity(all_vulnerabilities)
-
-        # Count fixable vulnerabilities
-        fixable_count = count_fixable(all_vulnerabilities)
+        _, status_emoji = SEVERITY_META[severity_priority]
 
         # Format scanners list
         scanners_str = ', '.join(sorted(all_scanners)) if all_scanners else 'None'
 
         # Format actual tools list (not including dependencies/unknown)
-        tool_names = [t['name'] for t in actual_tools]
         if tool_names:
             tools_str = ', '.join(tool_names[:3])  # Show first 3 tools
             if len(tool_names) > 3:
@@ -234,67 +313,43 @@ def generate_tool_summary_table(results_dir: str) -> str:
         else:
             tools_str = '—'  # No actual tools detected
 
-        # Count vulnerabilities in dependencies
-        deps_count = 0
-        if dependencies_entry:
-            for scanner_key in [k for k in dependencies_entry.keys() if k not in ['file_path', 'description', 'line_number', 'language']]:
-                deps_count += len(dependencies_entry[scanner_key])
-
-        # Count vulnerabilities in unknown
-        unknown_count = 0
-        if unknown_entry:
-            for scanner_key in [k for k in unknown_entry.keys() if k not in ['file_path', 'description', 'line_number', 'language']]:
-                unknown_count += len(unknown_entry[scanner_key])
-
         # Store row data with sort key
-        rows.append({
-            'org_repo': org_repo,
-            'tools': tools_str,
-            'tool_count': len(actual_tools),  # Only count actual tools
-            'deps_count': deps_count,
-            'unknown_count': unknown_count,
-            'filename': f'{org_name}-{repo_name}-tools.json',
-            'total': total_findings,
-            'severity_counts': severity_counts,
-            'fixable': fixable_count,
-            'scanners': scanners_str,
-            'status': status_emoji,
-            'sort_key': (-severity_priority, -total_findings, org_repo),  # Worst first, then by count
-        })
+        rows.append(ToolSummaryRow(
+            sort_key=(-severity_priority, -total_findings, org_repo),  # Worst first, then by count
+            org_repo=org_repo,
+            tools=tools_str,
+            tool_count=len(tool_names),  # Only count actual tools
+            deps_count=deps_count,
+            unknown_count=unknown_count,
+            filename=json_file.name,  # The file this row was read from
+            total=total_findings,
+            critical=severity_counts['CRITICAL'],
+            high=severity_counts['HIGH'],
+            medium=severity_counts['MEDIUM'],
+            low=severity_counts['LOW'],
+            fixable=fixable_count,
+            scanners=scanners_str,
+            status=status_emoji,
+        ))
 
     # Sort rows by severity (worst first), then by total vulnerabilities
-    rows.sort(key=lambda r: r['sort_key'])
-
-    # Generate table lines
-    lines = [
-        "# Vulnerability Scan Results by Tool",
-        "",
-        "This report shows vulnerabilities grouped by MCP tools.",
-        "",
-        "| Project | MCP Tools | Results | Total | Critical | High | Medium | Low | Fixable | Scanners | Status |",
-        "|---------|-----------|---------|-------|----------|------|--------|-----|---------|----------|--------|",
-    ]
+    rows.sort(key=operator.attrgetter('sort_key'))
 
-    for row in rows:
-        # Link to original GitHub repository
-        repo_link = f"[{row['org_repo']}](https://github.com/{row['org_repo']})"
+    # Header plus one line per row
+    yield from TOOL_SUMMARY_TABLE_HEADER
+    yield from map(TOOL_SUMMARY_ROW_FORMAT.format, rows)
 
-        # Link to results file
-        results_link = f"[📋 View](results_tools/{row['filename']})"
 
-        lines.append(
-            f"| {repo_link} | {row['tools']} | {results_link} | {row['total']} | "
-            f"{row['severity_counts']['CRITICAL']} | {row['severity_counts']['HIGH']} | "
-            f"{row['severity_counts']['MEDIUM']} | {row['severity_counts']['LOW']} | "
-            f"{row['fixable']} | {row['scanners']} | {row['status']} |"
-        )
+def generate_tool_summary_table(results_dir: str) -> str:
+    """
+    Generate summary table for SCAN_RESULTS_TOOLS.md.
 
-    return "\n".join(lines)
+    One row per repository showing all tools scanned.
+    """
+    return "\n".join(iter_tool_summary_lines(results_dir))
 
 
 def main():
-    import sys
-
     if len(sys.argv) < 4:
         print("Usage: aggregate_tool_results.py <org_name> <repo_name> <results_dir>")
         sys.exit(1)
@@ -303,20 +358,18 @@ def main():
     repo_name = sys.argv[2]
     results_dir = sys.argv[3]
 
-    # Aggregate results for this specific repo
-    results = aggregate_tool_results(org_name, repo_name, results_dir)
-
-    # Save aggregated results
-    save_tool_results(org_name, repo_name, results, results_dir)
-
-    # Generate full summary table from all repo files
-    summary = generate_tool_summary_table(results_dir)
-
-    # Write to SCAN_RESULTS_TOOLS.md
-    with open('SCAN_RESULTS_TOOLS.md', 'w') as f:
-        f.write(summary)
-
-    print("Generated SCAN_RESULTS_TOOLS.md with tool-based vulnerability summary")
+    # Aggregate results for this specific repo, then save them and remove the
+    # scanner files found by the same directory scan
+    scanner_files = scan_results_dir(results_dir, TOOL_VIOLATIONS_SUFFIX)
+    results = aggregate_tool_results(org_name, repo_name, results_dir, scanner_files)
+    save_tool_results(org_name, repo_name, results, results_dir, scanner_files)
+
+    # Generate full summary table from all repo files and write to SCAN_RESULTS_TOOLS.md,
+    # unless no tools file changed since it was last written
+    if write_summary('SCAN_RESULTS_TOOLS.md', results_dir, '-tools.json', iter_tool_summary_lines):
+        print("Generated SCAN_RESULTS_TOOLS.md with tool-based vulnerability summary")
+    else:
+        print("SCAN_RESULTS_TOOLS.md is up to date")
 
 
 if __name__ == '__main__':
@@ -4,32 +4,138 @@ Builds a dependency graph showing which files and functions each tool calls.
 This enables accurate vulnerability-to-tool mapping based on actual code paths.
 """
 import ast
+import multiprocessing
+import os
+import posixpath
+import re
+import sys
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
+from vmcp.utils.detect_language import SKIP_DIRS
 from vmcp.utils.tool_detector import MCPTool
 
+# Statement fields holding nested statement lists (except handlers and match
+# cases carry their own body)
+_PYTHON_BLOCK_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+# JS/TS imports, matched on raw bytes in a single pass:
+#   import ... from '...'
+#   require('...')
+_JS_IMPORT_RE = re.compile(
+    rb"""import\s+.*\s+from\s+['"]([^'"]+)['"]"""
+    rb"""|require\(['"]([^'"]+)['"]\)"""
+)
+
+# Minimum number of Python files in a repository before parsing is spread
+# across worker processes
+CALL_GRAPH_PARALLEL_MIN_FILES = 256
+
+# Number of files handed to a worker process at a time
+CALL_GRAPH_PARSE_CHUNK_SIZE = 32
+
+
+def _python_import_names(path: str) -> list[str]:
+    """
+    Return the unique module names a Python file imports.
+
+    A module-level function so it can run in a worker process. Files that
+    cannot be read or parsed import nothing.
+    """
+    imports = {}
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        # Extract imports. They are statements, so only statement lists are
+        # visited (module, if/try/with/loop, function and class bodies)
+        # instead of every expression node in the tree.
+        # Every import statement contains this keyword; a file without it
+        # has no dependencies and is never parsed
+        stack = [ast.parse(data.decode('utf-8', errors='ignore')).body] if b'import' in data else []
+        while stack:
+            for node in stack.pop():
+                # Handle: import foo, import foo.bar
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        imports[alias.name] = None
+
+                # Handle: from foo import bar
+                elif isinstance(node, ast.ImportFrom):
+                    if node.module:
+                        imports[node.module] = None
+
+                else:
+                    for field in _PYTHON_BLOCK_FIELDS:
+                        block = getattr(node, field, None)
+                        if block:
+                            stack.append(block)
+
+    except Exception:
+        # If parsing fails, the file has no resolvable imports
+        return []
+
+    return list(imports)
+
 
 class CallGraphBuilder:
     """Builds call graphs for MCP tools to track dependencies."""
 
     def __init__(self, repo_path: Path):
         self.repo_path = repo_path
-        self.tool_graphs: dict[str, set[str]] = {}
-
-    def build_graphs(self, tools: list[MCPTool]) -> dict[str, set[str]]:
+        self.tool_graphs: dict[str, frozenset[str]] = {}
+        # Canonical copy of each distinct tool graph, shared by tools with
+        # identical dependencies
+        self._graph_cache: dict[frozenset[str], frozenset[str]] = {}
+        # Per-file transitive dependencies, shared by every tool in build_graphs
+        self._py_deps_cache: dict[str, frozenset[str]] = {}
+        self._js_deps_cache: dict[str, frozenset[str]] = {}
+        # Per-file direct (resolved) imports, so each file is read and parsed once
+        self._py_imports_cache: dict[str, frozenset[str]] = {}
+        self._js_imports_cache: dict[str, frozenset[str]] = {}
+        # Repo-relative POSIX paths of every file and directory, so imports
+        # resolve with set lookups instead of a stat per candidate
+        self._files: set[str] = set()
+        self._dirs: set[str] = set()
+        self._index_repo()
+
+    def _index_repo(self) -> None:
+        """Walk the repository once, recording its files and directories."""
+        for root, dirs, files in os.walk(self.repo_path):
+            # Prune non-source directories so the walk never enters them
+            dirs[:] = [name for name in dirs if name not in SKIP_DIRS]
+
+            relative_root = os.path.relpath(root, self.repo_path)
+            prefix = '' if relative_root == '.' else f'{relative_root}/'
+            # Interned, so resolved paths share one string object per file
+            self._dirs.update(sys.intern(prefix + name) for name in dirs)
+            self._files.update(sys.intern(prefix + name) for name in files)
+
+    def build_graphs(self, tools: list[MCPTool]) -> dict[str, frozenset[str]]:
         """
         Build call graphs for all tools.
 
         Returns:
             Map of tool_name -> set of file paths the tool depends on
         """
+        # Parse in parallel only with more than one CPU and enough Python
+        # files to outweigh the cost of starting worker processes
+        if (
+            (os.process_cpu_count() or 1) > 1
+            and sum(1 for path in self._files if path.endswith('.py')) >= CALL_GRAPH_PARALLEL_MIN_FILES
+        ):
+            self._prefetch_python_imports(tools)
+
         for tool in tools:
-            self.tool_graphs[tool.name] = self._build_tool_graph(tool)
+            graph = self._build_tool_graph(tool)
+            self.tool_graphs[tool.name] = self._graph_cache.setdefault(graph, graph)
 
         return self.tool_graphs
 
-    def _build_tool_graph(self, tool: MCPTool) -> set[str]:
+    def _build_tool_graph(self, tool: MCPTool) -> frozenset[str]:
         """
         Build dependency graph for a single tool.
 
@@ -41,93 +147,144 @@ class CallGraphBuilder:
         Returns:
             Set of file paths (relative to repo root) that the tool depends on
         """
-        dependencies = set()
         tool_file_path = self.repo_path / tool.file_path
 
         # Always include the tool's own file
-        dependencies.add(tool.file_path)
+        own_file = frozenset((sys.intern(tool.file_path),))
 
         if not tool_file_path.exists():
-            return dependencies
+            return own_file
 
         # Language-specific graph building
         if tool.language == 'python':
-            dependencies.update(self._build_python_graph(tool_file_path, tool.file_path))
+            return own_file | self._build_python_graph(tool_file_path, tool.file_path)
         elif tool.language in ['typescript', 'javascript']:
-            dependencies.update(self._build_javascript_graph(tool_file_path, tool.file_path))
+            return own_file | self._build_javascript_graph(tool_file_path, tool.file_path)
 
-        return dependencies
+        return own_file
 
-    def _build_python_graph(self, file_path: Path, relative_path: str, visited: set[str] | None = None) -> set[str]:
+    def _build_python_graph(self, file_path: Path, relative_path: str) -> frozenset[str]:
         """
         Build dependency graph for Python file.
 
+        Transitive results are memoized per file, so a module shared by many
+        tools is only analyzed once per builder.
+
         Args:
             file_path: Absolute path to Python file
             relative_path: Path relative to repo root
-            visited: Set of already-visited files (to prevent cycles)
 
         Returns:
             Set of file paths this file depends on
         """
-        if visited is None:
-            visited = set()
+        return self._transitive_deps(
+            file_path, relative_path, self._py_deps_cache, self._python_imports, ('.py',)
+        )
+
+    def _transitive_deps(
+        self,
+        file_path: Path,
+        relative_path: str,
+        deps_cache: dict[str, frozenset[str]],
+        direct_deps: Callable[[Path, str], frozenset[str]],
+        suffixes: tuple[str, ...],
+    ) -> frozenset[str]:
+        """
+        Collect every file reachable from relative_path through direct_deps.
 
-        # Prevent circular imports
-        if relative_path in visited:
-            return set()
-        visited.add(relative_path)
+        Walks the import graph with an explicit stack; the seen set breaks
+        cycles. Files whose closure is already in deps_cache contribute it
+        directly instead of being walked again. Only complete closures are
+        cached, so a cycle never leaves a partial result behind.
+        """
+        cached = deps_cache.get(relative_path)
+        if cached is not None:
+            return cached
 
         dependencies = set()
+        seen = {relative_path}
+        stack = [(file_path, relative_path)]
+        while stack:
+            current_path, current_relative = stack.pop()
+            for resolved_path in direct_deps(current_path, current_relative):
+                dependencies.add(resolved_path)
+                if resolved_path in seen:
+                    continue
+                seen.add(resolved_path)
+
+                closure = deps_cache.get(resolved_path)
+                if closure is not None:
+                    dependencies.update(closure)
+                    continue
+
+                # Follow imported source files (transitive dependencies);
+                # resolved paths come from the file index, so they exist
+                if resolved_path.endswith(suffixes):
+                    stack.append((self.repo_path / resolved_path, resolved_path))
+
+        result = deps_cache[relative_path] = frozenset(dependencies)
+        return result
+
+    def _python_imports(self, file_path: Path, relative_path: str) -> frozenset[str]:
+        """Resolve the direct imports of a Python file, parsing it at most once."""
+        cached = self._py_imports_cache.get(relative_path)
+        if cached is not None:
+            return cached
+        return self._cache_python_imports(relative_path, _python_import_names(str(file_path)))
+
+    def _cache_python_imports(self, relative_path: str, import_names: list[str]) -> frozenset[str]:
+        """Resolve a file's import names to repo files and cache the result."""
+        dependencies = set()
 
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            tree = ast.parse(content)
+        # Resolve each unique import name to file paths once
+        current_dir = posixpath.dirname(relative_path)
+        for import_name in import_names:
+            resolved_paths = self._resolve_python_import(import_name, current_dir)
+            for resolved_path in resolved_paths:
+                if resolved_path:
+                    dependencies.add(resolved_path)
 
-            # Extract imports
-            for node in ast.walk(tree):
-                imports = []
+        result = self._py_imports_cache[relative_path] = frozenset(dependencies)
+        return result
 
-                # Handle: import foo, import foo.bar
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.append(alias.name)
-
-                # Handle: from foo import bar
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.append(node.module)
-
-                # Resolve imports to file paths
-                for import_name in imports:
-                    resolved_paths = self._resolve_python_import(import_name, file_path.parent)
-                    for resolved_path in resolved_paths:
-                        if resolved_path:
-                            dependencies.add(resolved_path)
-
-                            # Recursively analyze imported files (transitive dependencies)
-                            absolute_resolved = self.repo_path / resolved_path
-                            if absolute_resolved.exists() and absolute_resolved.suffix == '.py':
-                                transitive_deps = self._build_python_graph(
-                                    absolute_resolved,
-                                    resolved_path,
-                                    visited
-                                )
-                                dependencies.update(transitive_deps)
-
-        except Exception as e:
-            # If parsing fails, just return what we have
-            pass
-
-        return dependencies
+    def _prefetch_python_imports(self, tools: list[MCPTool]) -> None:
+        """
+        Parse every Python file reachable from the tools in worker processes.
 
-    def _resolve_python_import(self, import_name: str, current_dir: Path) -> list[str]:
+        Parsing is CPU-bound, so the import graph is explored breadth-first
+        and each level's unparsed files are spread across a process pool.
+        Workers only return import names; resolution and caching stay here,
+        so every file is still parsed once and the per-tool walk that follows
+        is served entirely from the cache.
+        """
+        frontier = {tool.file_path for tool in tools if tool.language == 'python' and tool.file_path in self._files}
+        # This runs in a worker thread of the tool orchestrator, so workers come
+        # from a forkserver rather than a fork that could inherit held locks
+        with ProcessPoolExecutor(
+            max_workers=os.process_cpu_count(),
+            mp_context=multiprocessing.get_context('forkserver'),
+        ) as pool:
+            while frontier:
+                pending = [path for path in frontier if path not in self._py_imports_cache]
+                import_names = pool.map(
+                    _python_import_names,
+                    [str(self.repo_path / path) for path in pending],
+                    chunksize=CALL_GRAPH_PARSE_CHUNK_SIZE,
+                )
+
+                frontier = set()
+                for relative_path, names in zip(pending, import_names):
+                    for resolved_path in self._cache_python_imports(relative_path, names):
+                        if resolved_path.endswith('.py') and resolved_path not in self._py_imports_cache:
+                            frontier.add(resolved_path)
+
+    def _resolve_python_import(self, import_name: str, current_dir: str) -> list[str]:
         """
         Resolve Python import to file paths.
 
         Args:
             import_name: e.g., "utils", "cyberchef_api_mcp_server.api_client"
-            current_dir: Directory of the file doing the import
+            current_dir: Directory of the file doing the import, relative to repo root
 
         Returns:
             List of possible file paths (relative to repo root)
@@ -138,122 +295,104 @@ class CallGraphBuilder:
         # e.g., "utils" -> "utils.py"
         # e.g., "cyberchef_api_mcp_server.api_client" -> "cyberchef_api_mcp_server/api_client.py"
         parts = import_name.split('.')
+        module_path = '/'.join(parts)
 
         # Try as direct module file
-        module_path = Path(*parts).with_suffix('.py')
-        module_file = self.repo_path / module_path
-        if module_file.exists():
-            paths.append(str(module_file.relative_to(self.repo_path)))
+        if f'{module_path}.py' in self._files:
+            paths.append(sys.intern(f'{module_path}.py'))
 
         # Try as package (__init__.py)
-        package_path = Path(*parts) / '__init__.py'
-        package_init = self.repo_path / package_path
-        if package_init.exists():
-            paths.append(str(package_init.relative_to(self.repo_path)))
+        if f'{module_path}/__init__.py' in self._files:
+            paths.append(sys.intern(f'{module_path}/__init__.py'))
 
         # Try relative to current directory
-        relative_file = current_dir / f"{parts[-1]}.py"
-        if relative_file.exists() and self.repo_path in relative_file.parents:
-            paths.append(str(relative_file.relative_to(self.repo_path)))
+        relative_file = posixpath.join(current_dir, f"{parts[-1]}.py")
+        if relative_file in self._files:
+            paths.append(sys.intern(relative_file))
 
         return paths
 
-    def _build_javascript_graph(self, file_path: Path, relative_path: str, visited: set[str] | None = None) -> set[str]:
+    def _build_javascript_graph(self, file_path: Path, relative_path: str) -> frozenset[str]:
         """
         Build dependency graph for JavaScript/TypeScript file.
 
         Uses simple regex matching for imports (not full AST parsing).
+        Transitive results are memoized per file like _build_python_graph.
 
         Args:
             file_path: Absolute path to JS/TS file
             relative_path: Path relative to repo root
-            visited: Set of already-visited files
 
         Returns:
             Set of file paths this file depends on
         """
-        if visited is None:
-            visited = set()
+        return self._transitive_deps(
+            file_path, relative_path, self._js_deps_cache, self._javascript_imports,
+            ('.js', '.ts', '.jsx', '.tsx'),
+        )
 
-        if relative_path in visited:
-            return set()
-        visited.add(relative_path)
+    def _javascript_imports(self, file_path: Path, relative_path: str) -> frozenset[str]:
+        """Resolve the relative imports of a JS/TS file, reading it at most once."""
+        cached = self._js_imports_cache.get(relative_path)
+        if cached is not None:
+            return cached
 
         dependencies = set()
 
         try:
-            import re
-
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-
-            # Match: import ... from '...'
-            # Match: require('...')
-            import_patterns = [
-                r"import\s+.*\s+from\s+['\"]([^'\"]+)['\"]",
-                r"require\(['\"]([^'\"]+)['\"]\)",
-            ]
-
-            for pattern in import_patterns:
-                for match in re.finditer(pattern, content):
-                    import_path = match.group(1)
-
-                    # Resolve relative imports
-                    if import_path.startswith('.'):
-                        resolved_paths = self._resolve_javascript_import(import_path, file_path.parent)
-                        for resolved_path in resolved_paths:
-                            if resolved_path:
-                                dependencies.add(resolved_path)
-
-                                # Recursively analyze
-                                absolute_resolved = self.repo_path / resolved_path
-                                if absolute_resolved.exists() and absolute_resolved.suffix in ['.js', '.ts', '.jsx', '.tsx']:
-                                    transitive_deps = self._build_javascript_graph(
-                                        absolute_resolved,
-                                        resolved_path,
-                                        visited
-                                    )
-                                    dependencies.update(transitive_deps)
+            content = file_path.read_bytes()
+
+            # Each distinct import path is resolved once
+            import_paths = {
+                match[1] or match[2]
+                for match in _JS_IMPORT_RE.finditer(content)
+            }
+            for import_path in import_paths:
+                # Resolve relative imports
+                if import_path.startswith(b'.'):
+                    resolved_paths = self._resolve_javascript_import(
+                        import_path.decode('utf-8', errors='ignore'), posixpath.dirname(relative_path)
+                    )
+                    for resolved_path in resolved_paths:
+                        if resolved_path:
+                            dependencies.add(resolved_path)
 
         except Exception:
             pass
 
-        return dependencies
+        result = self._js_imports_cache[relative_path] = frozenset(dependencies)
+        return result
 
-    def _resolve_javascript_import(self, import_path: str, current_dir: Path) -> list[str]:
+    def _resolve_javascript_import(self, import_path: str, current_dir: str) -> list[str]:
         """
         Resolve JavaScript/TypeScript import to file paths.
 
         Args:
             import_path: e.g., "./utils", "../api/client"
-            current_dir: Directory of the file doing the import
+            current_dir: Directory of the file doing the import, relative to repo root
 
         Returns:
             List of possible file paths (relative to repo root)
         """
-        paths = []
-
-        # Resolve relative path
-        resolved = (current_dir / import_path).resolve()
+        # Resolve relative path; anything above the repo root cannot match
+        resolved = posixpath.normpath(posixpath.join(current_dir, import_path))
 
         # Try with common extensions
         extensions = ['.ts', '.tsx', '.js', '.jsx', '']
         for ext in extensions:
-            file_with_ext = Path(str(resolved) + ext) if ext else resolved
-
-            if file_with_ext.exists() and self.repo_path in file_with_ext.parents:
-                paths.append(str(file_with_ext.relative_to(self.repo_path)))
-                break
+            file_with_ext = resolved + ext
+            if file_with_ext in self._files or (not ext and file_with_ext in self._dirs):
+                return [sys.intern(file_with_ext)]
 
             # Try as index file
-            index_file = file_with_ext / f'index{ext}' if not ext else file_with_ext.parent / file_with_ext.name / 'index' + ext
-            if index_file.exists() and self.repo_path in index_file.parents:
-                paths.append(str(index_file.relative_to(self.repo_path)))
-                break
+            index_file = posixpath.normpath(posixpath.join(resolved, f'index{ext}'))
+            if index_file in self._files:
+                return [sys.intern(index_file)]
 
-        return paths
+        return []
 
 
-def build_tool_call_graphs(tools: list[MCPTool], repo_path: str) -> dict[str, set[str]]:
+def build_tool_call_graphs(tools: list[MCPTool], repo_path: str) -> dict[str, frozenset[str]]:
     """
     Convenience function to build call graphs for all tools.
 
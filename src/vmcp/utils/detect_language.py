@@ -1,43 +1,76 @@
 """Detect repository languages and select appropriate scanners."""
 import json
 import os
+import re
 import subprocess
 import sys
-from pathlib import Path
+from collections import Counter
+from collections.abc import Iterator
+
+# Common non-source directories skipped when walking a repository
+SKIP_DIRS = frozenset({'.git', 'node_modules', '.venv', 'venv', '__pycache__', 'vendor'})
+
+# Language detection also skips build output, which would skew the counts
+LANGUAGE_SKIP_DIRS = SKIP_DIRS | {'dist', 'build', 'out', '.next', 'target'}
+
+# Minified bundles, type declarations and generated sources
+_GENERATED_FILE_RE = re.compile(r'\.min\.js$|\.d\.ts$|\.generated\.')
+
+
+# Common language file extensions
+LANGUAGE_EXTENSIONS = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.go': 'go',
+    '.java': 'java',
+    '.rb': 'ruby',
+    '.rs': 'rust',
+    '.php': 'php',
+    '.cs': 'csharp',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.scala': 'scala',
+}
+
+
+def _iter_source_extensions(repo_path: str) -> Iterator[str]:
+    """Yield the lowercased extension of every language file under repo_path."""
+    # Directories still to scan. An explicit stack instead of recursion means
+    # each extension is yielded by one generator frame, not one per level.
+    pending = [repo_path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if entry.is_dir():
+                        # Like os.walk, symlinked directories are not followed
+                        if name not in LANGUAGE_SKIP_DIRS and not entry.is_symlink():
+                            pending.append(entry.path)
+                        continue
+
+                    # Names like '.eslintrc' have no extension, as with Path.suffix
+                    dot = name.rfind('.')
+                    if dot > 0:
+                        ext = name[dot:].lower()
+                        if ext in LANGUAGE_EXTENSIONS and not _GENERATED_FILE_RE.search(name):
+                            yield ext
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            continue
 
 
 def detect_languages(repo_path: str) -> dict[str, int]:
     """Detect languages in repository using GitHub Linguist approach."""
     languages = {}
 
-    # Common language file extensions
-    extensions_map = {
-        '.py': 'python',
-        '.js': 'javascript',
-        '.ts': 'typescript',
-        '.go': 'go',
-        '.java': 'java',
-        '.rb': 'ruby',
-        '.rs': 'rust',
-        '.php': 'php',
-        '.cs': 'csharp',
-        '.cpp': 'cpp',
-        '.c': 'c',
-        '.swift': 'swift',
-        '.kt': 'kotlin',
-        '.scala': 'scala',
-    }
-
-    for root, _, files in os.walk(repo_path):
-        # Skip common non-source directories
-        if any(skip in root for skip in ['.git', 'node_modules', '.venv', 'venv', '__pycache__', 'vendor']):
-            continue
-
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext in extensions_map:
-                lang = extensions_map[ext]
-                languages[lang] = languages.get(lang, 0) + 1
+    # Tally extensions in one scandir pass, then fold them into languages
+    for ext, count in Counter(_iter_source_extensions(repo_path)).items():
+        lang = LANGUAGE_EXTENSIONS[ext]
+        languages[lang] = languages.get(lang, 0) + count
 
     return languages
 
@@ -1,104 +1,105 @@
 """Enhance CVE links with direct detail URLs."""
-import asyncio
-import json
+import os
 import re
 from typing import Any
 
-import httpx
+import ijson
+import orjson
 
-
-async def validate_cve_detail_url(cve_code: str, client: httpx.AsyncClient) -> str | None:
-    """Validate if CVE detail URL exists."""
-    detail_url = f"https://nvd.nist.gov/vuln/detail/{cve_code}"
-    try:
-        response = await client.head(detail_url, follow_redirects=True, timeout=10.0)
-        if response.status_code == 200:
-            return detail_url
-    except Exception:
-        pass
-    return None
+# Well-formed CVE ID; NVD serves a detail page for every one
+_CVE_RE = re.compile(r'CVE-\d{4}-\d{4,}')
 
 
-async def get_enhanced_cve_url(cve_code: str, client: httpx.AsyncClient) -> str:
-    """Get enhanced CVE URL with validation."""
-    # Try detail URL first
-    detail_url = await validate_cve_detail_url(cve_code, client)
-    if detail_url:
-        return detail_url
+def get_enhanced_cve_url(cve_code: str) -> str:
+    """Get the NVD detail URL for a CVE, or a search URL if the ID is malformed."""
+    # Detail URLs are deterministic, so no request is needed to build one
+    if _CVE_RE.fullmatch(cve_code):
+        return f"https://nvd.nist.gov/vuln/detail/{cve_code}"
 
     # Fallback to search URL
     return f"https://nvd.nist.gov/vuln/search#/nvd/home?keyword={cve_code}&resultType=records"
 
 
-async def enhance_vulnerability_references(
-    vulnerability: dict[str, Any],
-    client: httpx.AsyncClient
-) -> dict[str, Any]:
+def _find_cve_code(vulnerability: dict[str, Any]) -> str | None:
+    """Return the vulnerability's CVE ID, from its ID or else its aliases."""
+    # Check ID
+    if 'id' in vulnerability and _CVE_RE.fullmatch(vulnerability['id']):
+        return vulnerability['id']
+
+    # Check aliases
+    for alias in vulnerability.get('aliases', []):
+        if _CVE_RE.fullmatch(alias):
+            return alias
+    return None
+
+
+def enhance_vulnerability_references(vulnerability: dict[str, Any]) -> dict[str, Any]:
     """Enhance CVE references in a vulnerability."""
     if 'references' not in vulnerability:
         return vulnerability
 
-    cve_pattern = re.compile(r'CVE-\d{4}-\d+')
+    # Extract CVE code from the vulnerability ID or aliases
+    cve_code = _find_cve_code(vulnerability)
+    if cve_code is None:
+        return vulnerability
+    enhanced_url = get_enhanced_cve_url(cve_code)
 
     for reference in vulnerability.get('references', []):
-        url = reference.get('url', '')
-
-        # Check if this is a generic CVE URL
-        if 'nvd.nist.gov/vuln-metrics/cvss' in url or 'nvd.nist.gov' in url:
-            # Extract CVE code from the vulnerability ID or aliases
-            cve_code = None
-
-            # Check ID
-            if 'id' in vulnerability and cve_pattern.match(vulnerability['id']):
-                cve_code = vulnerability['id']
-            else:
-                # Check aliases
-                for alias in vulnerability.get('aliases', []):
-                    if cve_pattern.match(alias):
-                        cve_code = alias
-                        break
-
-            if cve_code:
-                enhanced_url = await get_enhanced_cve_url(cve_code, client)
-                reference['url'] = enhanced_url
+        # Replace generic NVD URLs
+        if 'nvd.nist.gov' in reference.get('url', ''):
+            reference['url'] = enhanced_url
 
     return vulnerability
 
 
-async def enhance_vulnerabilities(vulnerabilities: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def enhance_vulnerabilities(vulnerabilities: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Enhance all vulnerabilities with better CVE links."""
-    async with httpx.AsyncClient() as client:
-        tasks = [enhance_vulnerability_references(vuln, client) for vuln in vulnerabilities]
-        return await asyncio.gather(*tasks)
-
-
-async def process_results_file(file_path: str) -> None:
-    """Process a results file and enhance CVE links."""
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-
-    # Process each organization/repo
-    for org_repo, scanners in data.items():
-        for scanner, vulnerabilities in scanners.items():
-            if vulnerabilities:
-                enhanced = await enhance_vulnerabilities(vulnerabilities)
-                data[org_repo][scanner] = enhanced
-
-    # Write back
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
-
-
-async def main():
+    return [enhance_vulnerability_references(vuln) for vuln in vulnerabilities]
+
+
+def process_results_file(file_path: str) -> None:
+    """
+    Process a results file and enhance CVE links.
+
+    Organizations/repos are streamed from the file one at a time, so only
+    one repo's scanner results are in memory at once. The output goes to
+    <file_path>.tmp and is renamed over the original when complete.
+    """
+    tmp_path = f'{file_path}.tmp'
+    with open(file_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        try:
+            # Process each organization/repo
+            separator = b'{\n  '
+            for org_repo, scanners in ijson.kvitems(src, '', use_float=True):
+                for scanner, vulnerabilities in scanners.items():
+                    if vulnerabilities:
+                        scanners[scanner] = enhance_vulnerabilities(vulnerabilities)
+
+                # Nest the indented repo object one level under the top-level
+                # object; JSON strings never contain a raw newline
+                dst.write(separator)
+                dst.write(orjson.dumps(org_repo))
+                dst.write(b': ')
+                dst.write(orjson.dumps(scanners, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n  '))
+                separator = b',\n  '
+            dst.write(b'\n}' if separator == b',\n  ' else b'{}')
+            dst.close()
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def main():
     import sys
 
     if len(sys.argv) < 2:
         print("Usage: python enhance_cve_links.py <results_file>")
         sys.exit(1)
 
-    await process_results_file(sys.argv[1])
+    process_results_file(sys.argv[1])
     print(f"Enhanced CVE links in {sys.argv[1]}")
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    main()
@@ -5,12 +5,69 @@ More accurate than static analysis, but requires code execution.
 """
 import asyncio
 import json
+import os
+import re
 import subprocess
-from pathlib import Path
+import tomllib
+from functools import cached_property
+from pathlib import Path, PurePosixPath
 from typing import Any
 
+from vmcp.utils.detect_language import SKIP_DIRS
 from vmcp.utils.tool_detector import MCPTool
 
+# Largest JSON-RPC line read from a server; tools/list responses for servers
+# with many tools easily exceed asyncio's 64 KiB default
+MAX_RESPONSE_LINE_BYTES = 16 * 1024 * 1024
+
+# Common patterns for MCP server entry points, in order of preference
+ENTRY_POINT_PATTERNS = (
+    # Python FastMCP patterns
+    'server.py',
+    'main.py',
+    '__main__.py',
+    'src/server.py',
+    'src/main.py',
+    'src/__main__.py',
+    'src/**/server.py',
+    'src/**/main.py',
+    '**/server.py',
+    '**/main.py',
+    '**/__main__.py',
+    # TypeScript patterns
+    'index.ts',
+    'server.ts',
+    'src/index.ts',
+    'src/server.ts',
+    # Package.json bin entries
+    'package.json',
+)
+
+# File names the recursive entry point patterns can match
+_ENTRY_POINT_NAMES = frozenset(
+    pattern.rpartition('/')[2] for pattern in ENTRY_POINT_PATTERNS if '**' in pattern
+)
+
+# Any of these markers in a source file suggests it starts an MCP server
+PYTHON_ENTRY_POINT_MARKERS = (
+    b'mcp.run()',
+    b'FastMCP(',
+    b'Server(',
+    b'from mcp import',
+    b'from fastmcp import',
+    b'import mcp',
+    b'import fastmcp',
+)
+TYPESCRIPT_ENTRY_POINT_MARKERS = (
+    b'@modelcontextprotocol/sdk',
+    b'new Server(',
+    b'StdioServerTransport',
+)
+
+# One alternation per language, so a file is scanned once as raw bytes
+_PYTHON_ENTRY_POINT_RE = re.compile(b'|'.join(map(re.escape, PYTHON_ENTRY_POINT_MARKERS)))
+_TYPESCRIPT_ENTRY_POINT_RE = re.compile(b'|'.join(map(re.escape, TYPESCRIPT_ENTRY_POINT_MARKERS)))
+
 
 class RuntimeToolDetector:
     """Detects MCP tools by running the server and querying tools/list."""
@@ -19,6 +76,8 @@ class RuntimeToolDetector:
         self.repo_path = Path(repo_path)
         self.timeout = timeout
         self.tools: list[MCPTool] = []
+        # Source files searched for tool definitions, keyed by entry point
+        self._sources: dict[Path, list[tuple[Path, str]]] = {}
 
     async def detect_tools(self) -> list[MCPTool]:
         """
@@ -64,70 +123,63 @@ class RuntimeToolDetector:
 
     def _find_entry_point(self) -> Path | None:
         """Find the main MCP server entry point."""
-        # Common patterns for MCP server entry points
-        candidates = [
-            # Python FastMCP patterns
-            'server.py',
-            'main.py',
-            '__main__.py',
-            'src/server.py',
-            'src/main.py',
-            'src/__main__.py',
-            'src/**/server.py',
-            'src/**/main.py',
-            '**/server.py',
-            '**/main.py',
-            '**/__main__.py',
-            # TypeScript patterns
-            'index.ts',
-            'server.ts',
-            'src/index.ts',
-            'src/server.ts',
-            # Package.json bin entries
-            'package.json',
-        ]
-
-        for pattern in candidates:
-            matches = list(self.repo_path.glob(pattern))
-            if matches:
-                # Check if file contains MCP server initialization
-                for match in matches:
-                    if self._is_mcp_entry_point(match):
-                        return match
+        # Results of _is_mcp_entry_point, as files match several patterns
+        checked: dict[Path, bool] = {}
+        # Files named like an entry point, from one walk of the repository
+        # made the first time a recursive pattern is reached
+        named_files: list[tuple[PurePosixPath, Path]] | None = None
+
+        for pattern in ENTRY_POINT_PATTERNS:
+            if '**' in pattern:
+                if named_files is None:
+                    named_files = self._find_entry_point_files()
+                matches = [path for relative, path in named_files if relative.full_match(pattern)]
+            else:
+                path = self.repo_path / pattern
+                matches = [path] if path.is_file() else []
+
+            # Check if file contains MCP server initialization
+            for match in matches:
+                is_entry_point = checked.get(match)
+                if is_entry_point is None:
+                    is_entry_point = checked[match] = self._is_mcp_entry_point(match)
+                if is_entry_point:
+                    return match
 
         return None
 
+    def _find_entry_point_files(self) -> list[tuple[PurePosixPath, Path]]:
+        """Walk the repository once for files named like an entry point."""
+        named_files = []
+        for root, dirs, files in os.walk(self.repo_path):
+            # Prune non-source directories so the walk never enters them
+            dirs[:] = [name for name in dirs if name not in SKIP_DIRS]
+
+            relative_root = PurePosixPath(Path(root).relative_to(self.repo_path))
+            for name in files:
+                if name in _ENTRY_POINT_NAMES:
+                    named_files.append((relative_root / name, Path(root, name)))
+        return named_files
+
     def _is_mcp_entry_point(self, file_path: Path) -> bool:
         """Check if file is likely an MCP server entry point."""
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
+            content = file_path.read_bytes()
 
             # Python patterns
             if file_path.suffix == '.py':
-                if any(pattern in content for pattern in [
-                    'mcp.run()',
-                    'FastMCP(',
-                    'Server(',
-                    'from mcp import',
-                    'from fastmcp import',
-                    'import mcp',
-                    'import fastmcp',
-                ]):
+                if _PYTHON_ENTRY_POINT_RE.search(content):
                     return True
 
             # TypeScript patterns
             elif file_path.suffix in ['.ts', '.js']:
-                if any(pattern in content for pattern in [
-                    '@modelcontextprotocol/sdk',
-                    'new Server(',
-                    'StdioServerTransport',
-                ]):
+                if _TYPESCRIPT_ENTRY_POINT_RE.search(content):
                     return True
 
             # package.json
             elif file_path.name == 'package.json':
                 try:
-                    data = json.loads(content)
+                    data = json.loads(content.decode('utf-8', errors='ignore'))
                     # Check for bin entry or start script
                     if 'bin' in data or ('scripts' in data and 'start' in data.get('scripts', {})):
                         return True
@@ -139,18 +191,35 @@ class RuntimeToolDetector:
 
         return False
 
+    @cached_property
+    def _pyproject(self) -> dict[str, Any] | None:
+        """The repository's parsed pyproject.toml, {} if unparsable or None if absent."""
+        try:
+            with open(self.repo_path / 'pyproject.toml', 'rb') as f:
+                return tomllib.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return {}
+
+    @cached_property
+    def _package_json(self) -> Any:
+        """The repository's parsed package.json, {} if unparsable or None if absent."""
+        try:
+            return json.loads((self.repo_path / 'package.json').read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return {}
+
     def _get_server_command(self, entry_point: Path) -> list[str] | None:
         """Determine command to run the MCP server."""
         # Python servers
         if entry_point.suffix == '.py':
             # Check for pyproject.toml with script entry point
-            pyproject_file = self.repo_path / 'pyproject.toml'
-            if pyproject_file.exists():
+            config = self._pyproject
+            if config is not None:
                 try:
-                    import tomllib
-                    content = pyproject_file.read_text()
-                    config = tomllib.loads(content)
-
                     # Check for [project.scripts] entry point
                     scripts = config.get('project', {}).get('scripts', {})
                     if scripts:
@@ -171,10 +240,9 @@ class RuntimeToolDetector:
         # TypeScript/JavaScript servers
         elif entry_point.suffix in ['.ts', '.js']:
             # Check package.json for start command
-            package_json = self.repo_path / 'package.json'
-            if package_json.exists():
+            data = self._package_json
+            if data is not None:
                 try:
-                    data = json.loads(package_json.read_text())
                     # Use npm start if available
                     if 'scripts' in data and 'start' in data['scripts']:
                         return ['npm', 'start']
@@ -206,13 +274,15 @@ class RuntimeToolDetector:
             List of tool definitions from server
         """
         try:
-            # Start server process
+            # Start server process. stderr is never read, so discard it rather
+            # than let a chatty server block on a full pipe.
             process = await asyncio.create_subprocess_exec(
                 *command,
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
                 cwd=str(self.repo_path),
+                limit=MAX_RESPONSE_LINE_BYTES,
             )
 
             # MCP protocol requires initialization handshake first
@@ -231,7 +301,13 @@ class RuntimeToolDetector:
                 }
             }
 
-            # 2. Send tools/list request
+            # 2. Acknowledge the initialize response
+            initialized_notification = {
+                "jsonrpc": "2.0",
+                "method": "notifications/initialized",
+            }
+
+            # 3. Send tools/list request
             tools_request = {
                 "jsonrpc": "2.0",
                 "id": 2,
@@ -239,48 +315,38 @@ class RuntimeToolDetector:
                 "params": {}
             }
 
-            # Send both requests
-            requests = json.dumps(init_request) + '\n' + json.dumps(tools_request) + '\n'
-
-            # Send requests and wait for responses
+            # Exchange messages one line at a time, returning as soon as the
+            # tools/list response arrives instead of waiting on the pipe
             try:
-                process.stdin.write(requests.encode())
-                await process.stdin.drain()
-
-                # Read responses with timeout
-                stdout_data = await asyncio.wait_for(
-                    process.stdout.read(1024 * 100),  # Read up to 100KB
-                    timeout=self.timeout
-                )
+                async with asyncio.timeout(self.timeout):
+                    await self._send_message(process, init_request)
+                    if await self._read_response(process, 1) is None:
+                        return None
 
-                # Close process
-                process.stdin.close()
-                try:
-                    await asyncio.wait_for(process.wait(), timeout=2)
-                except asyncio.TimeoutError:
-                    process.kill()
-                    await process.wait()
+                    await self._send_message(process, initialized_notification)
+                    await self._send_message(process, tools_request)
+                    response = await self._read_response(process, 2)
 
             except asyncio.TimeoutError:
                 process.kill()
                 await process.wait()
                 raise
 
-            # Parse responses
-            if stdout_data:
-                # MCP servers send JSON-RPC responses line by line
-                for line in stdout_data.decode('utf-8', errors='ignore').strip().split('\n'):
-                    if not line:
-                        continue
+            finally:
+                # Close process
+                if process.returncode is None:
+                    process.stdin.close()
                     try:
-                        response = json.loads(line)
-                        # Check if this is the tools/list response
-                        if response.get('id') == 2 and 'result' in response:
-                            tools = response['result'].get('tools', [])
-                            if tools:
-                                return tools
-                    except json.JSONDecodeError:
-                        continue
+                        await asyncio.wait_for(process.wait(), timeout=2)
+                    except asyncio.TimeoutError:
+                        process.kill()
+                        await process.wait()
+
+            # Check if this is the tools/list response
+            if response and 'result' in response:
+                tools = response['result'].get('tools', [])
+                if tools:
+                    return tools
 
             return None
 
@@ -288,6 +354,29 @@ class RuntimeToolDetector:
             print(f"  Error querying server: {e}")
             return None
 
+    async def _send_message(self, process: asyncio.subprocess.Process, message: dict[str, Any]) -> None:
+        """Write one newline-delimited JSON-RPC message to the server."""
+        process.stdin.write(json.dumps(message).encode() + b'\n')
+        await process.stdin.drain()
+
+    async def _read_response(
+        self, process: asyncio.subprocess.Process, request_id: int
+    ) -> dict[str, Any] | None:
+        """
+        Read lines until the JSON-RPC response to request_id arrives.
+
+        MCP servers send JSON-RPC messages line by line; log output and
+        other messages in between are skipped. Returns None at end of output.
+        """
+        while line := await process.stdout.readline():
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(response, dict) and response.get('id') == request_id:
+                return response
+        return None
+
     def _parse_tools_response(self, tools_list: list[dict[str, Any]], entry_point: Path) -> list[MCPTool]:
         """Convert MCP tools/list response to MCPTool objects."""
         parsed_tools = []
@@ -325,6 +414,30 @@ class RuntimeToolDetector:
         Returns:
             (relative_file_path, line_number)
         """
+        # Look for a Python or JS function definition, including async ones
+        definition = re.compile(rf'(?:def|function) {re.escape(tool_name)}\(')
+
+        for file_path, content in self._source_files(entry_point):
+            match = definition.search(content)
+            if match:
+                relative_path = str(file_path.relative_to(self.repo_path))
+                return relative_path, content.count('\n', 0, match.start()) + 1
+
+        # Default to entry point if not found
+        relative_path = str(entry_point.relative_to(self.repo_path))
+        return relative_path, 0
+
+    def _source_files(self, entry_point: Path) -> list[tuple[Path, str]]:
+        """
+        Read the entry point and its sibling source files once per detector.
+
+        Every tool from tools/list is searched for in the same files, so
+        their contents are cached rather than re-read per tool.
+        """
+        sources = self._sources.get(entry_point)
+        if sources is not None:
+            return sources
+
         # Search in entry point and nearby files
         search_files = [entry_point]
 
@@ -332,26 +445,13 @@ class RuntimeToolDetector:
         if entry_point.parent != self.repo_path:
             search_files.extend(entry_point.parent.glob(f'*{entry_point.suffix}'))
 
+        sources = self._sources[entry_point] = []
         for file_path in search_files:
             try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                lines = content.split('\n')
-
-                # Look for function definition
-                for i, line in enumerate(lines, 1):
-                    if f'def {tool_name}(' in line or f'async def {tool_name}(' in line:
-                        relative_path = str(file_path.relative_to(self.repo_path))
-                        return relative_path, i
-                    elif f'function {tool_name}(' in line or f'async function {tool_name}(' in line:
-                        relative_path = str(file_path.relative_to(self.repo_path))
-                        return relative_path, i
-
+                sources.append((file_path, file_path.read_text(encoding='utf-8', errors='ignore')))
             except Exception:
                 continue
-
-        # Default to entry point if not found
-        relative_path = str(entry_point.relative_to(self.repo_path))
-        return relative_path, 0
+        return sources
 
 
 async def detect_tools_runtime(repo_path: str, timeout: int = 30) -> list[MCPTool]:
@@ -3,17 +3,62 @@
 Detects and extracts tool definitions from MCP server codebases.
 Extensible architecture with language-specific detectors.
 """
+import ast
 import asyncio
 import json
+import mmap
+import os
 import re
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Any
 
+import orjson
+
+from vmcp.utils.detect_language import SKIP_DIRS
+
+# Non-source directories never scanned for tool definitions
+TOOL_SKIP_DIRS = SKIP_DIRS | {'dist', 'build'}
+
+# Below this many candidate files a detector scans them on the calling thread
+TOOL_SCAN_PARALLEL_MIN_FILES = 64
+
+# Files at least this large are checked for tool markers through a memory
+# mapping, so the common miss never copies them into memory
+TOOL_MMAP_MIN_BYTES = 2 * 1024 * 1024
+
+# Leading bytes sniffed to tell source files from binaries and minified bundles
+SOURCE_SNIFF_BYTES = 8192
+# Lines longer than this in the sniffed head mark a file as minified or generated
+MAX_SOURCE_LINE_LENGTH = 2000
+
+# Bumped whenever static detection changes, invalidating cached results
+TOOL_CACHE_VERSION = 2
+
+
+def _looks_like_source(head: bytes) -> bool:
+    """Return whether a file's leading bytes look like hand-written source code."""
+    if b'\0' in head:
+        return False
+    return max(map(len, head.split(b'\n'))) <= MAX_SOURCE_LINE_LENGTH
+
+
+def _decode_source(data: bytes) -> str:
+    """Decode source bytes the way read_text does, including newline translation."""
+    content = data.decode('utf-8', errors='ignore')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
 
 class MCPTool:
     """Represents an MCP tool."""
 
+    __slots__ = ('name', 'file_path', 'description', 'line_number', 'language')
+
     def __init__(self, name: str, file_path: str, description: str = '', line_number: int = 0, language: str = ''):
         self.name = name
         self.file_path = file_path
@@ -37,8 +82,17 @@ class MCPTool:
 class BaseLanguageDetector(ABC):
     """Base class for language-specific MCP tool detectors."""
 
+    # Literals at least one of which every file defining tools contains;
+    # set by each subclass
+    TOOL_MARKERS: tuple[bytes, ...]
+
     def __init__(self, repo_path: Path):
         self.repo_path = repo_path
+        # Per-language results of earlier scans, keyed by repo-relative path;
+        # set by ToolDetector when a cache file is configured
+        self.cache: dict[str, dict[str, Any]] | None = None
+        # Candidate files found by the last detect_all_tools walk
+        self.source_files: list[Path] | None = None
 
     @property
     @abstractmethod
@@ -65,30 +119,90 @@ class BaseLanguageDetector(ABC):
     def detect_all_tools(self) -> list[MCPTool]:
         """Detect all tools in repository for this language."""
         tools = []
-
-        # Find all relevant files
-        for ext in self.file_extensions:
-            files = list(self.repo_path.rglob(f'*{ext}'))
+        files = self.source_files = self._find_source_files()
+
+        scan = self.detect_tools_in_file
+        if self.cache is not None:
+            # Rebuilt from scratch each run so deleted files drop out
+            previous = self.cache.get(self.language_name, {})
+            current: dict[str, Any] = {}
+            self.cache[self.language_name] = current
+            scan = partial(self._detect_tools_in_file_cached, previous=previous, current=current)
+
+        # Reads dominate on large trees, so overlap them across threads;
+        # map keeps results in walk order
+        if len(files) >= TOOL_SCAN_PARALLEL_MIN_FILES:
+            with ThreadPoolExecutor() as executor:
+                for file_tools in executor.map(scan, files):
+                    tools.extend(file_tools)
+        else:
             for file_path in files:
-                # Skip common non-source directories
-                if any(skip in file_path.parts for skip in ['.git', 'node_modules', '.venv', 'venv', '__pycache__', 'vendor', 'dist', 'build']):
-                    continue
+                tools.extend(scan(file_path))
+
+        return tools
+
+    def _read_marked_file(self, file_path: Path) -> bytes | None:
+        """
+        Return a file's bytes, or None when it can't define tools.
+
+        Files containing none of TOOL_MARKERS are rejected, as are binaries
+        and minified bundles, whose markers would only come from bundled
+        library code.
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= TOOL_MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if not _looks_like_source(mapped[:SOURCE_SNIFF_BYTES]):
+                        return None
+                    if all(mapped.find(marker) == -1 for marker in self.TOOL_MARKERS):
+                        return None
+                return f.read()
+            data = f.read()
+        if not any(marker in data for marker in self.TOOL_MARKERS):
+            return None
+        return data if _looks_like_source(data[:SOURCE_SNIFF_BYTES]) else None
+
+    def _find_source_files(self) -> list[Path]:
+        """Find all relevant files, pruning non-source directories so their contents are never listed."""
+        extensions = tuple(self.file_extensions)
+        files = []
+        for dirpath, dirnames, filenames in os.walk(self.repo_path):
+            dirnames[:] = [d for d in dirnames if d not in TOOL_SKIP_DIRS]
+            for filename in filenames:
+                if filename.endswith(extensions):
+                    files.append(Path(dirpath, filename))
+        return files
+
+    def _detect_tools_in_file_cached(
+        self, file_path: Path, previous: dict[str, Any], current: dict[str, Any]
+    ) -> list[MCPTool]:
+        """Detect tools in a file, reusing the previous result while its mtime and size are unchanged."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return []
 
-                tools.extend(self.detect_tools_in_file(file_path))
+        relative_path = os.path.relpath(file_path, self.repo_path)
+        fingerprint = [stat.st_mtime_ns, stat.st_size]
+        entry = previous.get(relative_path)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            current[relative_path] = entry
+            return [MCPTool(**tool) for tool in entry['tools']]
 
+        tools = self.detect_tools_in_file(file_path)
+        current[relative_path] = {'fingerprint': fingerprint, 'tools': [tool.to_dict() for tool in tools]}
         return tools
 
 
 class PythonToolDetector(BaseLanguageDetector):
     """Detects MCP tools in Python code (FastMCP, official SDK)."""
 
-    # Python patterns for tool decorators
-    TOOL_PATTERNS = [
-        # @mcp.tool() or @server.tool() (allows newlines between decorator and def)
-        re.compile(r'@(?:mcp|server)\.tool\(\s*(?:name=[\"\']([^\"\']+)[\"\'])?\s*\)\s*\n\s*(?:async\s+)?def\s+(\w+)', re.MULTILINE),
-        # @tool decorator (from fastmcp) (allows newlines between decorator and def)
-        re.compile(r'@tool\(\s*(?:name=[\"\']([^\"\']+)[\"\'])?\s*\)\s*\n\s*(?:async\s+)?def\s+(\w+)', re.MULTILINE),
-    ]
+    # Objects whose .tool() decorates MCP tools; a bare tool() is fastmcp's
+    TOOL_DECORATOR_OWNERS = frozenset({'mcp', 'server'})
+    # Literal every tool decorator call contains; files without it are skipped
+    TOOL_MARKERS = (b'tool(',)
+    # Statement fields that can hold nested function definitions
+    BLOCK_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
 
     @property
     def language_name(self) -> str:
@@ -103,49 +217,74 @@ class PythonToolDetector(BaseLanguageDetector):
         tools = []
 
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-
-            # Extract docstrings for descriptions
-            docstrings = {}
-            docstring_pattern = re.compile(r'def\s+(\w+)\s*\([^)]*\)\s*(?:->.*?)?\s*:\s*"""([^"]+)"""', re.MULTILINE | re.DOTALL)
-            for match in docstring_pattern.finditer(content):
-                func_name, docstring = match.groups()
-                docstrings[func_name] = docstring.strip().split('\n')[0]  # First line only
-
-            # Find tool decorators
-            for pattern in self.TOOL_PATTERNS:
-                for match in pattern.finditer(content):
-                    # Pattern can match (name, func_name) or just (func_name,)
-                    groups = match.groups()
-                    if len(groups) == 2 and groups[0]:
-                        tool_name = groups[0]  # Explicit name in decorator
-                        func_name = groups[1]
-                    else:
-                        tool_name = groups[-1]  # Use function name
-                        func_name = groups[-1]
-
-                    # Get line number
-                    line_number = content[:match.start()].count('\n') + 1
-
-                    # Get description
-                    description = docstrings.get(func_name, '')
-
-                    relative_path = str(file_path.relative_to(self.repo_path))
-
-                    tools.append(MCPTool(
-                        name=tool_name,
-                        file_path=relative_path,
-                        description=description,
-                        line_number=line_number,
-                        language=self.language_name
-                    ))
+            # Most files define no tools; skip them before decoding or parsing
+            data = self._read_marked_file(file_path)
+            if data is None:
+                return tools
+            tree = ast.parse(_decode_source(data), filename=str(file_path))
+
+            relative_path = str(file_path.relative_to(self.repo_path))
+
+            # Walk statement lists only; tool functions are never inside expressions
+            stack = [tree]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    decorator = self._tool_decorator(node)
+                    if decorator is not None:
+                        # Explicit name in decorator, otherwise the function name
+                        tool_name = self._decorator_tool_name(decorator) or node.name
+                        docstring = ast.get_docstring(node) or ''
+
+                        tools.append(MCPTool(
+                            name=tool_name,
+                            file_path=relative_path,
+                            description=docstring.split('\n')[0],  # First line only
+                            line_number=decorator.lineno,
+                            language=self.language_name
+                        ))
+
+                for field in self.BLOCK_FIELDS:
+                    stack.extend(reversed(getattr(node, field, ())))
 
         except Exception:
-            # Skip files that can't be read
-            pass
+            # Skip files that can't be read or parsed
+            return []
 
+        tools.sort(key=lambda tool: tool.line_number)
         return tools
 
+    def _tool_decorator(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> ast.Call | None:
+        """Return the @mcp.tool(), @server.tool() or @tool() decorator of a function, if any."""
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call):
+                continue
+            func = decorator.func
+            if isinstance(func, ast.Name) and func.id == 'tool':
+                return decorator
+            if (
+                isinstance(func, ast.Attribute) and func.attr == 'tool'
+                and isinstance(func.value, ast.Name) and func.value.id in self.TOOL_DECORATOR_OWNERS
+            ):
+                return decorator
+        return None
+
+    def _decorator_tool_name(self, decorator: ast.Call) -> str | None:
+        """Return the tool name given to a decorator as name= or its first argument."""
+        for keyword in decorator.keywords:
+            if keyword.arg == 'name':
+                return self._string_value(keyword.value)
+        if decorator.args:
+            return self._string_value(decorator.args[0])
+        return None
+
+    @staticmethod
+    def _string_value(node: ast.expr) -> str | None:
+        """Return the value of a string literal node, or None for anything else."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        return None
+
     def is_mcp_server(self) -> bool:
         """Check if repository contains Python MCP server dependencies."""
         dep_files = ['requirements.txt', 'pyproject.toml', 'Pipfile']
@@ -164,13 +303,16 @@ class PythonToolDetector(BaseLanguageDetector):
 class TypeScriptToolDetector(BaseLanguageDetector):
     """Detects MCP tools in TypeScript/JavaScript code."""
 
-    # TypeScript patterns for tool decorators
-    TOOL_PATTERNS = [
-        # @Tool({ ... }) decorator
-        re.compile(r'@Tool\({[^}]*}\)\s*(?:async\s+)?(?:function\s+)?(\w+)', re.MULTILINE),
-        # server.setRequestHandler(ListToolsRequestSchema, ...)
-        re.compile(r'setRequestHandler\s*\(\s*ListToolsRequestSchema[^)]*\)\s*.*?name:\s*[\"\']([^\"\']+)[\"\']', re.MULTILINE | re.DOTALL),
-    ]
+    # Tool definitions, matched in a single pass: an @Tool({ ... }) decorator,
+    # capturing its description, or server.setRequestHandler(ListToolsRequestSchema, ...)
+    TOOL_PATTERN = re.compile(
+        rb'@Tool\({(?:[^}]*?description:\s*[\"\'](?P<description>[^\"\']+)[\"\'])?[^}]*}\)'
+        rb'\s*(?:async\s+)?(?:function\s+)?(?P<func>\w+)'
+        rb'|setRequestHandler\s*\(\s*ListToolsRequestSchema[^)]*\)\s*.*?name:\s*[\"\'](?P<name>[^\"\']+)[\"\']',
+        re.MULTILINE | re.DOTALL,
+    )
+    # Literals that one of the TOOL_PATTERN alternatives always contains
+    TOOL_MARKERS = (b'@Tool(', b'ListToolsRequestSchema')
 
     @property
     def language_name(self) -> str:
@@ -185,34 +327,35 @@ class TypeScriptToolDetector(BaseLanguageDetector):
         tools = []
 
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-
-            # Find tool decorators
-            for pattern in self.TOOL_PATTERNS:
-                for match in pattern.finditer(content):
-                    tool_name = match.group(1)
-
-                    # Get line number
-                    line_number = content[:match.start()].count('\n') + 1
-
-                    # Try to extract description from decorator
-                    description = ''
-                    decorator_match = re.search(
-                        rf'@Tool\({{[^}}]*description:\s*[\"\']([^\"\']+)[\"\'][^}}]*}}\)\s*(?:async\s+)?(?:function\s+)?{re.escape(tool_name)}',
-                        content
-                    )
-                    if decorator_match:
-                        description = decorator_match.group(1)
-
-                    relative_path = str(file_path.relative_to(self.repo_path))
-
-                    tools.append(MCPTool(
-                        name=tool_name,
-                        file_path=relative_path,
-                        description=description,
-                        line_number=line_number,
-                        language=self.language_name
-                    ))
+            # Most files define no tools; skip them before running any regex.
+            # The patterns are ASCII, so they run on the raw bytes and only
+            # matched names are decoded
+            data = self._read_marked_file(file_path)
+            if data is None:
+                return tools
+
+            relative_path = str(file_path.relative_to(self.repo_path))
+
+            # Find tool decorators. Matches arrive in order, so line numbers are
+            # counted forward from the previous match, not from the file start
+            line_number, line_pos = 1, 0
+            for match in self.TOOL_PATTERN.finditer(data):
+                tool_name = (match['func'] or match['name']).decode('utf-8', errors='ignore')
+
+                # Get line number
+                line_number += data.count(b'\n', line_pos, match.start())
+                line_pos = match.start()
+
+                # Description captured from the decorator, if any
+                description = (match['description'] or b'').decode('utf-8', errors='ignore')
+
+                tools.append(MCPTool(
+                    name=tool_name,
+                    file_path=relative_path,
+                    description=description,
+                    line_number=line_number,
+                    language=self.language_name
+                ))
 
         except Exception:
             pass
@@ -236,13 +379,12 @@ class TypeScriptToolDetector(BaseLanguageDetector):
 class GoToolDetector(BaseLanguageDetector):
     """Detects MCP tools in Go code (mcp-go library)."""
 
-    # Go patterns for MCP tools
-    TOOL_PATTERNS = [
-        # mcpgo.NewTool("tool_name", ...)
-        re.compile(r'mcpgo\.NewTool\s*\(\s*["\']([^"\']+)["\']', re.MULTILINE),
-        # Alternative: mcp.NewTool("tool_name", ...)
-        re.compile(r'mcp\.NewTool\s*\(\s*["\']([^"\']+)["\']', re.MULTILINE),
-    ]
+    # mcpgo.NewTool("tool_name", ...) or mcp.NewTool("tool_name", ...)
+    TOOL_PATTERN = re.compile(rb'(?:mcpgo|mcp)\.NewTool\s*\(\s*["\']([^"\']+)["\']', re.MULTILINE)
+    # WithDescription("...") following a NewTool call
+    DESCRIPTION_PATTERN = re.compile(rb'WithDescription\s*\(\s*["\']([^"\']+)["\']')
+    # Only files implementing the mcp.McpTool interface define tools
+    TOOL_MARKERS = (b'McpTool',)
 
     @property
     def language_name(self) -> str:
@@ -254,11 +396,12 @@ class GoToolDetector(BaseLanguageDetector):
 
     def is_mcp_server(self) -> bool:
         """Check if repository contains a Go MCP server."""
-        # Look for mcp-go imports
-        for go_file in self.repo_path.rglob('*.go'):
+        # Look for mcp-go imports, reusing the files found by the static scan
+        go_files = self.source_files if self.source_files is not None else self._find_source_files()
+        for go_file in go_files:
             try:
-                content = go_file.read_text(encoding='utf-8', errors='ignore')
-                if 'github.com/mark3labs/mcp-go' in content or 'mcp.McpTool' in content:
+                data = go_file.read_bytes()
+                if b'github.com/mark3labs/mcp-go' in data or b'mcp.McpTool' in data:
                     return True
             except Exception:
                 continue
@@ -267,46 +410,46 @@ class GoToolDetector(BaseLanguageDetector):
     def detect_tools_in_file(self, file_path: Path) -> list[MCPTool]:
         """Detect MCP tools in a Go file."""
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            tools = []
-
-            # Check if this file implements mcp.McpTool interface
-            if 'mcp.McpTool' not in content and 'McpTool' not in content:
+            # Check if this file implements mcp.McpTool interface. The patterns
+            # are ASCII, so they run on the raw bytes without decoding
+            data = self._read_marked_file(file_path)
+            if data is None:
                 return []
 
-            # Find all tool definitions using NewTool
-            for pattern in self.TOOL_PATTERNS:
-                for match in pattern.finditer(content):
-                    tool_name = match.group(1)
-                    line_number = content[:match.start()].count('\n') + 1
-
-                    # Try to find description nearby
-                    description = self._extract_description(content, match.start())
-
-                    tools.append(MCPTool(
-                        name=tool_name,
-                        file_path=str(file_path.relative_to(self.repo_path)),
-                        description=description,
-                        line_number=line_number,
-                        language='go'
-                    ))
+            tools = []
+            relative_path = str(file_path.relative_to(self.repo_path))
+
+            # Find all tool definitions using NewTool, counting line numbers
+            # forward from the previous match
+            line_number, line_pos = 1, 0
+            for match in self.TOOL_PATTERN.finditer(data):
+                tool_name = match.group(1).decode('utf-8', errors='ignore')
+                line_number += data.count(b'\n', line_pos, match.start())
+                line_pos = match.start()
+
+                # Try to find description nearby
+                description = self._extract_description(data, match.start())
+
+                tools.append(MCPTool(
+                    name=tool_name,
+                    file_path=relative_path,
+                    description=description,
+                    line_number=line_number,
+                    language='go'
+                ))
 
             return tools
 
         except Exception:
             return []
 
-    def _extract_description(self, content: str, match_pos: int) -> str:
+    def _extract_description(self, content: bytes, match_pos: int) -> str:
         """Extract tool description from WithDescription() call."""
-        # Look for WithDescription("...") near the match
-        desc_pattern = re.compile(r'WithDescription\s*\(\s*["\']([^"\']+)["\']')
-
-        # Search in the next 500 characters
-        snippet = content[match_pos:match_pos + 500]
-        match = desc_pattern.search(snippet)
+        # Look for WithDescription("...") in the next 500 bytes
+        match = self.DESCRIPTION_PATTERN.search(content, match_pos, match_pos + 500)
 
         if match:
-            return match.group(1)
+            return match.group(1).decode('utf-8', errors='ignore')
         return ""
 
 
@@ -321,11 +464,13 @@ class ToolDetector:
         # Add new language detectors here
     ]
 
-    def __init__(self, repo_path: str, use_runtime_detection: bool = True):
+    def __init__(self, repo_path: str, use_runtime_detection: bool = True, cache_path: str | None = None):
         self.repo_path = Path(repo_path)
         self.tools: list[MCPTool] = []
         self.detectors: list[BaseLanguageDetector] = []
         self.use_runtime_detection = use_runtime_detection
+        # Optional JSON file persisting static detection results per file
+        self.cache_path = Path(cache_path) if cache_path else None
 
         # Initialize all detectors
         for detector_class in self.DETECTOR_CLASSES:
@@ -371,9 +516,13 @@ class ToolDetector:
 
         # Fall back to static detection
         print("🔍 Running static tool detection...")
+        cache = self._load_cache()
         for detector in self.detectors:
+            detector.cache = cache
             detected_tools = detector.detect_all_tools()
             self.tools.extend(detected_tools)
+        if cache is not None:
+            self.cache_path.write_bytes(orjson.dumps({'version': TOOL_CACHE_VERSION, 'languages': cache}))
 
         if self.tools:
             print(f"✅ Static detection found {len(self.tools)} tools")
@@ -390,30 +539,43 @@ class ToolDetector:
 
         return self.tools
 
+    def _load_cache(self) -> dict[str, dict[str, Any]] | None:
+        """Load per-file static detection results, or None when caching is off."""
+        if self.cache_path is None:
+            return None
+        try:
+            data = orjson.loads(self.cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            # Missing or unreadable cache: rescan everything
+            return {}
+        if not isinstance(data, dict) or data.get('version') != TOOL_CACHE_VERSION:
+            return {}
+        return data['languages']
+
     def _is_any_mcp_server(self) -> bool:
         """Check if repository is an MCP server in any supported language."""
         for detector in self.detectors:
+            # A language with no source files found by the static scan can't
+            # host the server, so its dependency files aren't read
+            if detector.source_files == []:
+                continue
             if detector.is_mcp_server():
                 return True
         return False
 
     def get_tools_by_file(self) -> dict[str, list[MCPTool]]:
         """Group tools by their source file."""
-        tools_by_file: dict[str, list[MCPTool]] = {}
+        tools_by_file: defaultdict[str, list[MCPTool]] = defaultdict(list)
         for tool in self.tools:
-            if tool.file_path not in tools_by_file:
-                tools_by_file[tool.file_path] = []
             tools_by_file[tool.file_path].append(tool)
-        return tools_by_file
+        return dict(tools_by_file)
 
     def get_tools_by_language(self) -> dict[str, list[MCPTool]]:
         """Group tools by programming language."""
-        tools_by_lang: dict[str, list[MCPTool]] = {}
+        tools_by_lang: defaultdict[str, list[MCPTool]] = defaultdict(list)
         for tool in self.tools:
-            if tool.language not in tools_by_lang:
-                tools_by_lang[tool.language] = []
             tools_by_lang[tool.language].append(tool)
-        return tools_by_lang
+        return dict(tools_by_lang)
 
 
 def detect_tools_in_repo(repo_path: str) -> list[MCPTool]:
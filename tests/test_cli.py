@@ -0,0 +1,53 @@
+"""Tests for the CLI clone helpers."""
+import subprocess
+import tempfile
+from pathlib import Path
+
+from vmcp import cli
+
+
+async def test_sparse_clone_keeps_lockfiles(monkeypatch):
+    """Test that a manifest-only sparse checkout keeps dependency lockfiles."""
+    manifests = [
+        'package.json', 'package-lock.json', 'pnpm-lock.yaml', 'yarn.lock',
+        'go.mod', 'go.sum', 'pyproject.toml', 'setup.py', 'setup.cfg',
+        'requirements.txt', 'uv.lock', 'web/package-lock.json',
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        origin = Path(temp_dir) / 'origin'
+        for name in [*manifests, 'src/main.py']:
+            path = origin / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('{}\n')
+        git = ['git', '-C', str(origin), '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        subprocess.run(['git', 'init', '-q', str(origin)], check=True)
+        subprocess.run([*git, 'add', '.'], check=True)
+        subprocess.run([*git, 'commit', '-q', '-m', 'init'], check=True)
+
+        monkeypatch.setattr(cli, 'CACHE_DIR', Path(temp_dir) / 'cache')
+        repo_path = await cli.get_or_clone_repo(origin.as_uri(), 'org', 'repo', sparse=True)
+
+        for name in manifests:
+            assert (repo_path / name).is_file(), name
+        assert not (repo_path / 'src' / 'main.py').exists()
+
+
+async def test_select_scanners_cached_reuses_detection_for_head(monkeypatch):
+    """Test that language detection is cached against the checked-out commit."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = Path(temp_dir) / 'repo'
+        repo_path.mkdir()
+        (repo_path / 'main.py').write_text('print("hi")\n')
+        git = ['git', '-C', str(repo_path), '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        subprocess.run(['git', 'init', '-q', str(repo_path)], check=True)
+        subprocess.run([*git, 'add', '.'], check=True)
+        subprocess.run([*git, 'commit', '-q', '-m', 'init'], check=True)
+
+        scanners = await cli.select_scanners_cached(repo_path)
+        assert (Path(temp_dir) / 'repo.langs.json').is_file()
+
+        def fail(repo_path):
+            raise AssertionError('languages detected again')
+
+        monkeypatch.setattr(cli, 'detect_languages', fail)
+        assert await cli.select_scanners_cached(repo_path) == scanners
@@ -8,6 +8,7 @@ from vmcp.models import (
     VulnerabilityModel,
     VulnerabilityReferenceModel,
     VulnerabilityScoreModel,
+    VulnerabilitySeverity,
 )
 
 
@@ -128,3 +129,20 @@ def test_invalid_severity():
             summary="Test"
         )
         assert vuln.severity == severity
+
+
+def test_severity_enum_priority():
+    """Test severities are coerced to the enum and ordered worst first."""
+    vuln = VulnerabilityModel(
+        id="TEST-001",
+        identifier_type="test",
+        affected_range="1.0.0",
+        details="Test",
+        severity="CRITICAL",
+        summary="Test"
+    )
+
+    assert vuln.severity is VulnerabilitySeverity.CRITICAL
+    assert VulnerabilitySeverity.CRITICAL.priority < VulnerabilitySeverity.HIGH.priority
+    assert VulnerabilitySeverity.HIGH.priority < VulnerabilitySeverity.LOW.priority
+    assert VulnerabilitySeverity.NONE.priority == max(s.priority for s in VulnerabilitySeverity)
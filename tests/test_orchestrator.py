@@ -1,10 +1,15 @@
 """Tests for scanner orchestration."""
+import asyncio
+import os
+import sys
 import tempfile
 from pathlib import Path
 
 import pytest
 
 from vmcp.orchestrator import ScanOrchestrator
+from vmcp.scanners.base import SCANNER_NICENESS, create_scanner_process
+from vmcp.tool_orchestrator import ToolBasedScanOrchestrator
 
 
 def test_orchestrator_initialization():
@@ -24,6 +29,37 @@ def test_scanner_map_exists():
     assert 'yara' in ScanOrchestrator.SCANNER_MAP
 
 
+@pytest.mark.parametrize('value', ['abc', '0', '-3', ''])
+def test_invalid_max_parallel_scanners_falls_back_to_cpu_count(monkeypatch, value):
+    """Test that unusable VMCP_MAX_PARALLEL_SCANNERS values don't break initialization."""
+    monkeypatch.setenv('VMCP_MAX_PARALLEL_SCANNERS', value)
+    orchestrator = ScanOrchestrator("/tmp/test", "org", "repo")
+    assert orchestrator.max_parallel_scanners == (os.process_cpu_count() or 2)
+
+
+def test_max_parallel_scanners_from_environment(monkeypatch):
+    """Test that a valid VMCP_MAX_PARALLEL_SCANNERS value is used."""
+    monkeypatch.setenv('VMCP_MAX_PARALLEL_SCANNERS', '3')
+    assert ScanOrchestrator("/tmp/test", "org", "repo").max_parallel_scanners == 3
+
+
+async def test_scanner_process_runs_at_lower_priority():
+    """Test that scanner subprocesses and the threads they start run at lower priority."""
+    # Report the niceness seen by a thread the scanner starts, not just its main thread
+    script = (
+        'import os, threading\n'
+        'def report():\n'
+        '    print(os.getpriority(os.PRIO_PROCESS, threading.get_native_id()))\n'
+        'thread = threading.Thread(target=report)\n'
+        'thread.start()\n'
+        'thread.join()\n'
+    )
+    proc = await create_scanner_process(sys.executable, '-c', script)
+    stdout, _ = await proc.communicate()
+    expected = min(os.getpriority(os.PRIO_PROCESS, 0) + SCANNER_NICENESS, 19)
+    assert int(stdout) == expected
+
+
 def test_save_results():
     """Test saving results to JSON file."""
     with tempfile.TemporaryDirectory() as temp_dir:
@@ -51,3 +87,35 @@ def test_save_results():
 
         assert 'testorg/testrepo' in trivy_data
         assert 'trivy' in trivy_data['testorg/testrepo']
+
+
+def test_tool_analysis_never_runs_the_server():
+    """Test that tool-based scans detect tools without starting the repository's server."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir) / 'repo'
+        root.mkdir()
+        marker = Path(temp_dir) / 'started'
+        (root / 'pyproject.toml').write_text('[project]\nname = "probe"\ndependencies = ["mcp"]\n')
+        (root / 'server.py').write_text(
+            'from pathlib import Path\n'
+            f'Path({str(marker)!r}).touch()\n'
+            'from mcp.server.fastmcp import FastMCP\n'
+            'mcp = FastMCP("probe")\n'
+            '\n'
+            '@mcp.tool()\n'
+            'def probe():\n'
+            '    pass\n'
+            '\n'
+            'mcp.run()\n'
+        )
+
+        orchestrator = ToolBasedScanOrchestrator(str(root), 'org', 'repo')
+        assert orchestrator.tool_detector.use_runtime_detection is False
+
+        async def analyze() -> None:
+            # Mirrors run_all_scanners_by_tool, where no loop runs in the worker thread
+            await asyncio.to_thread(orchestrator._analyze_tools)
+
+        asyncio.run(analyze())
+        assert [tool.name for tool in orchestrator.tools] == ['probe']
+        assert not marker.exists()
@@ -1,9 +1,12 @@
 """Tests for utility functions."""
+import sys
 import tempfile
 from pathlib import Path
 
-from vmcp.utils.aggregate_results import get_worst_severity
+from vmcp.utils.aggregate_results import SUMMARY_FORMAT_VERSION, get_worst_severity, write_summary
+from vmcp.utils.call_graph import build_tool_call_graphs
 from vmcp.utils.detect_language import detect_languages, select_scanners
+from vmcp.utils.tool_detector import MCPTool, PythonToolDetector, ToolDetector, TypeScriptToolDetector
 
 
 def test_get_worst_severity_empty():
@@ -49,6 +52,36 @@ def test_get_worst_severity_priority():
     ]) == 'MEDIUM'
 
 
+def test_write_summary_skips_unchanged_reports(monkeypatch):
+    """Test that summaries are regenerated only when results or the report format change."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results_dir = Path(temp_dir) / 'results'
+        results_dir.mkdir()
+        (results_dir / 'org-repo-violations.json').write_text('[]')
+        summary_path = str(Path(temp_dir) / 'SCAN_RESULTS.md')
+
+        def render(results_dir):
+            return ['# Results']
+
+        def render_v2(results_dir):
+            return ['# Results v2']
+
+        assert write_summary(summary_path, str(results_dir), '-violations.json', render)
+        assert not write_summary(summary_path, str(results_dir), '-violations.json', render)
+
+        # A different renderer or a bumped format version rewrites the report
+        assert write_summary(summary_path, str(results_dir), '-violations.json', render_v2)
+        assert Path(summary_path).read_text() == '# Results v2'
+        # vmcp.utils re-exports the aggregate_results function over its module name
+        monkeypatch.setattr(sys.modules[write_summary.__module__], 'SUMMARY_FORMAT_VERSION', SUMMARY_FORMAT_VERSION + 1)
+        assert write_summary(summary_path, str(results_dir), '-violations.json', render_v2)
+
+        # So does a new results file
+        (results_dir / 'org-other-violations.json').write_text('[]')
+        assert write_summary(summary_path, str(results_dir), '-violations.json', render_v2)
+        assert not write_summary(summary_path, str(results_dir), '-violations.json', render_v2)
+
+
 def test_detect_languages_empty():
     """Test language detection on empty directory."""
     with tempfile.TemporaryDirectory() as temp_dir:
@@ -82,6 +115,33 @@ def test_detect_languages_multiple():
         assert 'go' in languages
 
 
+def test_detect_languages_skips_non_source_dirs():
+    """Test that dependency and VCS directories are not counted."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (Path(temp_dir) / 'src').mkdir()
+        (Path(temp_dir) / 'src' / 'App.JS').write_text('console.log()')
+        (Path(temp_dir) / 'node_modules' / 'dep').mkdir(parents=True)
+        (Path(temp_dir) / 'node_modules' / 'dep' / 'index.js').write_text('')
+        (Path(temp_dir) / '.git').mkdir()
+        (Path(temp_dir) / '.git' / 'hook.py').write_text('')
+
+        languages = detect_languages(temp_dir)
+        assert languages == {'javascript': 1}
+
+
+def test_detect_languages_skips_build_output():
+    """Test that build directories and generated files are not counted."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (Path(temp_dir) / 'index.ts').write_text('export {}')
+        (Path(temp_dir) / 'types.d.ts').write_text('export {}')
+        (Path(temp_dir) / 'app.min.js').write_text('')
+        (Path(temp_dir) / 'dist').mkdir()
+        (Path(temp_dir) / 'dist' / 'index.js').write_text('')
+
+        languages = detect_languages(temp_dir)
+        assert languages == {'typescript': 1}
+
+
 def test_select_scanners_python():
     """Test scanner selection for Python."""
     scanners = select_scanners({'python': 10})
@@ -104,3 +164,119 @@ def test_select_scanners_empty():
     # Should still include general scanners
     assert 'trivy' in scanners
     assert 'osv-scanner' in scanners
+
+
+def test_call_graph_javascript_imports():
+    """Test JS/TS import resolution, including unresolvable imports."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / 'lib').mkdir()
+        (root / 'lib' / 'index.ts').write_text('export const x = 1')
+        (root / 'util.js').write_text("const lib = require('./lib')")
+        (root / 'server.ts').write_text(
+            "const missing = require('./missing')\n"
+            "import { util } from './util'\n"
+        )
+
+        tool = MCPTool('tool', 'server.ts', language='typescript')
+        graphs = build_tool_call_graphs([tool], temp_dir)
+        assert graphs['tool'] == {'server.ts', 'util.js', 'lib/index.ts'}
+
+
+def test_python_tool_detector_decorators():
+    """Test detection of @mcp.tool, @server.tool and @tool decorators."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / 'server.py').write_text(
+            '@mcp.tool()\n'
+            'def first():\n'
+            '    """First tool."""\n'
+            '\n'
+            '@tool(name="renamed")\n'
+            'async def second():\n'
+            '    pass\n'
+            '\n'
+            '@server.tool()\n'
+            'def third():\n'
+            '    pass\n'
+        )
+
+        tools = PythonToolDetector(root).detect_all_tools()
+        assert [(t.name, t.line_number) for t in tools] == [
+            ('first', 1), ('renamed', 5), ('third', 9)
+        ]
+        assert tools[0].description == 'First tool.'
+
+
+def test_python_tool_detector_multiline_decorators_and_docstrings():
+    """Test tools with multiline decorators, single-quoted docstrings and nesting."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / 'server.py').write_text(
+            'class Tools:\n'
+            '    @mcp.tool(\n'
+            '        name="search",\n'
+            '        description="ignored",\n'
+            '    )\n'
+            '    async def do_search(self):\n'
+            "        '''Search things.\n"
+            '\n'
+            "        More detail.'''\n"
+            '\n'
+            '@other.tool()\n'
+            'def not_a_tool():\n'
+            '    pass\n'
+        )
+
+        tools = PythonToolDetector(root).detect_all_tools()
+        assert [(t.name, t.line_number, t.description) for t in tools] == [
+            ('search', 2, 'Search things.')
+        ]
+
+
+def test_typescript_tool_detector_descriptions():
+    """Test @Tool decorators with and without a description."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / 'server.ts').write_text(
+            '@Tool({ name: "search", description: "Search things" })\n'
+            'async function search() {}\n'
+            '@Tool({ name: "fetch" })\n'
+            'function fetch() {}\n'
+        )
+
+        tools = TypeScriptToolDetector(root).detect_all_tools()
+        assert [(t.name, t.line_number, t.description) for t in tools] == [
+            ('search', 1, 'Search things'), ('fetch', 3, '')
+        ]
+
+
+def test_typescript_tool_detector_skips_minified_bundles():
+    """Test that minified bundles are not scanned for tools."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / 'bundle.js').write_text(
+            'var a=1;' * 500 + '@Tool({ name: "bundled" }) function bundled() {}\n'
+        )
+
+        assert TypeScriptToolDetector(root).detect_all_tools() == []
+
+
+def test_tool_detector_cache_reuses_unchanged_files():
+    """Test that cached static detection results follow file changes."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir) / 'repo'
+        root.mkdir()
+        cache_path = Path(temp_dir) / 'repo.tools.json'
+        server = root / 'server.py'
+        server.write_text('@mcp.tool()\ndef first():\n    pass\n')
+
+        detector = ToolDetector(str(root), use_runtime_detection=False, cache_path=str(cache_path))
+        assert [t.name for t in detector.detect_tools()] == ['first']
+        assert cache_path.exists()
+
+        # Served from the cache
+        assert [t.name for t in detector.detect_tools()] == ['first']
+
+        server.write_text('@mcp.tool()\ndef second_tool():\n    pass\n')
+        assert [t.name for t in detector.detect_tools()] == ['second_tool']
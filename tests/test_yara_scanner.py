@@ -1,9 +1,12 @@
 """Tests for YARA scanner."""
+import os
 import tempfile
+import time
 from pathlib import Path
 
 import pytest
 
+from vmcp.scanners import yara as yara_module
 from vmcp.scanners.yara import YaraScanner, YARA_AVAILABLE
 
 
@@ -177,3 +180,148 @@ async def test_yara_scanner_skips_excluded_directories():
 
         # Should complete without scanning excluded directories
         assert isinstance(results, list)
+
+
+def test_yara_iter_files_skips_excluded_directories():
+    """Test that file traversal yields sizes and skips excluded directories."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (Path(temp_dir) / "node_modules").mkdir()
+        (Path(temp_dir) / "node_modules" / "dep.js").write_text("test")
+        (Path(temp_dir) / "src").mkdir()
+        (Path(temp_dir) / "src" / "main.py").write_text("print('hi')")
+
+        scanner = YaraScanner(temp_dir, "testorg", "testrepo")
+        files = [(path, st.st_size) for path, st in scanner._iter_files(temp_dir)]
+
+        assert files == [(str(Path(temp_dir) / "src" / "main.py"), 11)]
+
+
+@pytest.mark.asyncio
+async def test_yara_scanner_incremental_rescan_reuses_findings():
+    """Test that a re-scan skips unchanged files but still reports their findings."""
+    if not YARA_AVAILABLE:
+        pytest.skip("YARA not available")
+
+    with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as rules_dir:
+        rules_path = Path(rules_dir) / "test.yar"
+        rules_path.write_text('rule test_marker { strings: $a = "vmcp-marker" condition: $a }')
+        marked = Path(temp_dir) / "marked.txt"
+        marked.write_text("vmcp-marker")
+        os.utime(marked, (0, 0))
+
+        scanner = YaraScanner(temp_dir, "testorg", "testrepo")
+        scanner.rules_path = rules_path
+        scanner.state_path = Path(rules_dir) / "testrepo.yara.json"
+
+        first = await scanner.scan()
+        assert [v.id for v in first] == ["test_marker"]
+        # State is kept outside the scanned checkout
+        assert scanner.state_path.exists()
+        assert [p.name for p in Path(temp_dir).iterdir()] == ["marked.txt"]
+
+        # Unchanged file: findings come from the saved state
+        second = await scanner.scan()
+        assert second == first
+
+        # Modified file: rescanned
+        marked.write_text("clean")
+        assert await scanner.scan() == []
+
+
+@pytest.mark.asyncio
+async def test_yara_scanner_incremental_rescan_matches_unrecorded_files():
+    """Test that files with no recorded match (restored with old mtimes, or failed) are matched again."""
+    if not YARA_AVAILABLE:
+        pytest.skip("YARA not available")
+
+    with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as rules_dir:
+        rules_path = Path(rules_dir) / "test.yar"
+        rules_path.write_text('rule test_marker { strings: $a = "vmcp-marker" condition: $a }')
+        clean = Path(temp_dir) / "clean.txt"
+        clean.write_text("clean")
+        os.utime(clean, (0, 0))
+
+        scanner = YaraScanner(temp_dir, "testorg", "testrepo")
+        scanner.rules_path = rules_path
+        scanner.state_path = Path(rules_dir) / "testrepo.yara.json"
+        assert await scanner.scan() == []
+
+        # A file restored with an old mtime (cp -p, tar, rsync) was never matched
+        restored = Path(temp_dir) / "restored.txt"
+        restored.write_text("vmcp-marker")
+        os.utime(restored, (0, 0))
+        assert [v.file_location for v in await scanner.scan()] == ["restored.txt"]
+
+        # A file that failed to scan is left out of the state and matched again
+        rules_key = scanner._rules_key()
+        findings, fingerprints, _ = scanner._collect_files({})
+        scanner._save_state(scanner.state_path, rules_key, time.time_ns(), findings, fingerprints, {"restored.txt"})
+        assert set(scanner._load_state(scanner.state_path, rules_key)["files"]) == {"clean.txt"}
+        assert [v.file_location for v in await scanner.scan()] == ["restored.txt"]
+
+
+@pytest.mark.asyncio
+async def test_yara_scanner_matches_image_polyglots():
+    """Test that payloads behind image magic bytes (e.g. GIF89a webshells) are still matched."""
+    if not YARA_AVAILABLE:
+        pytest.skip("YARA not available")
+
+    with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as rules_dir:
+        rules_path = Path(rules_dir) / "test.yar"
+        rules_path.write_text('rule test_webshell { strings: $a = "<?php eval(" condition: $a }')
+        (Path(temp_dir) / "shell.gif").write_bytes(b"GIF89a<?php eval($_POST['c']); ?>")
+        (Path(temp_dir) / "shell.png").write_bytes(b"\x89PNG\r\n\x1a\n<?php eval($_GET['c']); ?>")
+
+        scanner = YaraScanner(temp_dir, "testorg", "testrepo")
+        scanner.rules_path = rules_path
+        results = await scanner.scan(full_scan=True)
+        assert sorted(v.file_location for v in results) == ["shell.gif", "shell.png"]
+
+
+def test_yara_compiled_rules_keep_current_copy():
+    """Test that compiling removes stale .yarac copies but keeps the current one."""
+    if not YARA_AVAILABLE:
+        pytest.skip("YARA not available")
+
+    with tempfile.TemporaryDirectory() as rules_dir:
+        rules_path = Path(rules_dir) / "test.yar"
+        rules_path.write_text('rule test_marker { strings: $a = "vmcp-marker" condition: $a }')
+        stale = Path(rules_dir) / "test.1.2.yarac"
+        stale.write_bytes(b"")
+
+        scanner = YaraScanner(rules_dir, "testorg", "testrepo")
+        scanner.rules_path = rules_path
+        compiled = scanner._compiled_rules_path()
+
+        assert compiled.parent == Path(rules_dir)
+        assert compiled.exists()
+        assert not stale.exists()
+
+
+def test_yara_compiled_rules_fall_back_when_rules_dir_is_read_only(monkeypatch):
+    """Test that compiled rules are saved to the fallback directory when the rules directory is read-only."""
+    if not YARA_AVAILABLE:
+        pytest.skip("YARA not available")
+
+    with tempfile.TemporaryDirectory() as rules_dir, tempfile.TemporaryDirectory() as cache_dir:
+        rules_path = Path(rules_dir) / "test.yar"
+        rules_path.write_text('rule test_marker { strings: $a = "vmcp-marker" condition: $a }')
+        monkeypatch.setattr(yara_module, "YARA_COMPILED_RULES_FALLBACK_DIR", Path(cache_dir))
+
+        save = YaraScanner._save_compiled_rules
+
+        def save_unless_rules_dir(self, rules, cache_path):
+            if cache_path.parent == Path(rules_dir):
+                raise PermissionError("read-only")
+            save(self, rules, cache_path)
+
+        monkeypatch.setattr(YaraScanner, "_save_compiled_rules", save_unless_rules_dir)
+
+        scanner = YaraScanner(rules_dir, "testorg", "testrepo")
+        scanner.rules_path = rules_path
+        compiled = scanner._compiled_rules_path()
+
+        assert compiled.parent == Path(cache_dir)
+        assert compiled.exists()
+        # Later scans find the fallback copy without recompiling
+        assert scanner._compiled_rules_path() == compiled